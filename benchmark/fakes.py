@@ -0,0 +1,39 @@
+import numpy as np
+from util.similarity_engine import SimilarityEngine
+
+class InMemoryVectorDB:
+    """벤치마크용 VectorDBConnector(PGVector) 대역. 유사 상품 검색은 SimilarityEngine 사용"""
+    def __init__(self):
+        # id -> (status, primary_category_id, secondary_category_id, vector)
+        self.rows = {}
+
+    def upsert_embeddings_bulk(self, embeddings: list, chunk_size: int = None) -> int:
+        if not embeddings:
+            return 0
+        vectors = np.asarray([item["image_vector"] for item in embeddings], dtype=np.float32)
+        if vectors.ndim != 2 or not np.isfinite(vectors).all():
+            raise ValueError("Invalid embedding batch")
+        for item, vector in zip(embeddings, vectors):
+            self.rows[item["product_id"]] = (
+                item["status"], item["primary_category_id"], item["secondary_category_id"], vector
+            )
+        return len(embeddings)
+
+    def upsert_embeddings(self, embeddings: list):
+        self.upsert_embeddings_bulk(embeddings)
+
+    def fetch_vectors(self, product_ids: list) -> list:
+        return [(pid, row[1], row[2], row[3]) for pid, row in ((pid, self.rows.get(pid)) for pid in product_ids) if row]
+
+    def fetch_partition_vectors(self, primary_category_id: int, secondary_category_id: int, status: str = 'SALE') -> tuple:
+        ids = sorted(pid for pid, row in self.rows.items()
+                     if row[0] == status and row[1] == primary_category_id and row[2] == secondary_category_id)
+        if not ids:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+        return np.asarray(ids, dtype=np.int64), np.vstack([self.rows[pid][3] for pid in ids])
+
+    def get_similar_products(self, product_ids: list, top_k: int = 100) -> dict:
+        return SimilarityEngine(self).get_similar_products(product_ids, top_k)
+
+    def close(self):
+        pass
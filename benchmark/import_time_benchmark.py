@@ -0,0 +1,128 @@
+"""
+main/ 엔트리포인트 콜드 스타트(import) 시간 벤치마크.
+
+엔트리포인트마다 새 파이썬 프로세스를 띄워서
+- import: 모듈 import에 걸린 시간과 그때 올라온 무거운 패키지
+- early_exit: PRODUCT_IDS가 비어 있어서 바로 끝나는 실행의 전체 시간 (인터프리터 기동 포함)
+을 반복 측정하고 중앙값/최솟값을 JSON으로 출력.
+
+사용 예:
+    python -m benchmark.import_time_benchmark --repeat 5 --output import_time.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import statistics
+
+ENTRY_POINTS = [
+    "main.embedding_current_products",
+    "main.extract_current_similar_products",
+    "main.embedding_current_products_daily",
+    "main.embedding_current_products_macro",
+    "main.extract_current_similar_products_macro",
+    "main.fetch_product_daily",
+    "main.embedding_service",
+]
+
+# PRODUCT_IDS가 비면 DB/모델을 건드리지 않고 끝나는 엔트리포인트
+EARLY_EXIT_ENTRY_POINTS = [
+    "main.embedding_current_products",
+    "main.extract_current_similar_products",
+]
+
+# import 됐는지 확인할 무거운 패키지
+HEAVY_MODULES = ["mediapipe", "cv2", "torch", "transformers", "requests", "sshtunnel", "sqlalchemy", "asyncpg"]
+
+_IMPORT_PROBE = """
+import sys, time, json, importlib
+start = time.perf_counter()
+importlib.import_module(sys.argv[1])
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [name for name in sys.argv[2:] if name in sys.modules]}))
+"""
+
+
+def measure_import(module: str, env: dict) -> dict:
+    """새 프로세스에서 모듈 하나를 import하고 걸린 시간/올라온 무거운 패키지 반환"""
+    result = subprocess.run(
+        [sys.executable, "-c", _IMPORT_PROBE, module] + HEAVY_MODULES,
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure_early_exit(module: str, env: dict) -> float:
+    """PRODUCT_IDS 없이 python -m 으로 실행했을 때 전체 소요 시간(초)"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", module], env=dict(env, PRODUCT_IDS=""),
+                   capture_output=True, check=True)
+    return time.perf_counter() - start
+
+
+def summarize(samples: list) -> dict:
+    return {
+        "median_ms": round(statistics.median(samples) * 1000, 1),
+        "min_ms": round(min(samples) * 1000, 1),
+        "runs": len(samples),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry-point cold-start benchmark")
+    parser.add_argument('--repeat', type=int, default=5, help='Fresh processes per measurement')
+    parser.add_argument('--modules', type=str, nargs='*', default=None, help='Entry points to measure (default: all main/ scripts)')
+    parser.add_argument('--output', type=str, default=None, help='Write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    modules = args.modules or ENTRY_POINTS
+
+    # 인터프리터 기동만의 시간 (각 측정값의 바닥)
+    baseline = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], env=env, check=True)
+        baseline.append(time.perf_counter() - start)
+
+    entry_points = {}
+    for module in modules:
+        samples = []
+        loaded = []
+        try:
+            for _ in range(args.repeat):
+                probe = measure_import(module, env)
+                samples.append(probe["seconds"])
+                loaded = probe["loaded"]
+        except subprocess.CalledProcessError as e:
+            print(f"Error importing {module}: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        entry_points[module] = {"import": summarize(samples), "heavy_modules_loaded": loaded}
+
+        if module in EARLY_EXIT_ENTRY_POINTS:
+            runs = [measure_early_exit(module, env) for _ in range(args.repeat)]
+            entry_points[module]["early_exit"] = summarize(runs)
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "interpreter_startup": summarize(baseline),
+        "entry_points": entry_points,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
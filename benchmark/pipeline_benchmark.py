@@ -0,0 +1,313 @@
+"""
+임베딩/추출 파이프라인 단계별 벤치마크.
+
+합성 상품 카탈로그(로컬 HTTP 서버로 제공하는 이미지)로 embed_batch, get_similar_products 를 측정하고
+--pg 일 때는 upsert_embeddings_bulk, --mysql 일 때는 update_similar_products_bulk 도 측정해서
+단계별 처리량과 p50/p99 지연시간을 JSON으로 출력.
+
+저장 단계는 인메모리 대역으로는 비용이 의미가 없으므로 실제 DB에서만 측정하고, 운영 DB에 쓰지 않도록
+- --pg 는 PG_URL을 직접 지정했을 때만 동작하고 실행마다 새로 만든 scratch 스키마의 product 테이블을 씀
+- --mysql 은 DB_URL을 직접 지정했을 때만 동작하고 실행마다 새로 만든 scratch 데이터베이스의 product 테이블을 씀
+(SSH_HOST/PG_HOST 등 운영 설정으로는 연결하지 않음, scratch 스키마/데이터베이스는 끝나면 지움)
+측정하지 않은 단계는 결과 JSON의 skipped_stages에 이유와 함께 기록.
+
+사용 예:
+    python -m benchmark.pipeline_benchmark --products 2000 --output bench.json
+    PG_URL=postgresql+psycopg2://... python -m benchmark.pipeline_benchmark --pg   # 실제 PGVector
+    DB_URL=mysql+pymysql://... python -m benchmark.pipeline_benchmark --mysql      # 실제 MySQL similar_ids 갱신
+"""
+import os
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import platform
+import numpy as np
+
+from benchmark.synthetic_catalog import generate_images, serve_directory, build_catalog
+from benchmark.fakes import InMemoryVectorDB
+
+
+class StageTimer:
+    """한 단계의 전체 소요 시간, 처리 건수, 개별 호출 지연시간 기록"""
+    def __init__(self):
+        self.seconds = 0.0
+        self.items = 0
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def add_latency(self, seconds: float):
+        with self._lock:
+            self.latencies.append(seconds)
+
+    def report(self) -> dict:
+        result = {
+            "items": self.items,
+            "seconds": round(self.seconds, 6),
+            "throughput_per_s": round(self.items / self.seconds, 3) if self.seconds > 0 else None,
+        }
+        if self.latencies:
+            latencies_ms = np.asarray(self.latencies) * 1000
+            result["latency_ms"] = {
+                "count": len(latencies_ms),
+                "p50": round(float(np.percentile(latencies_ms, 50)), 3),
+                "p99": round(float(np.percentile(latencies_ms, 99)), 3),
+                "max": round(float(latencies_ms.max()), 3),
+            }
+        return result
+
+
+def timed(timer: StageTimer, func):
+    """func 호출마다 지연시간을 timer에 기록하는 래퍼"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timer.add_latency(time.perf_counter() - start)
+    return wrapper
+
+
+def bench_embedding(model, catalog: list, resize: tuple, stages: dict) -> list:
+    # 1) 다운로드 + 디코딩 + 리사이즈만 (iter_images)
+    fetch = stages.setdefault("fetch_decode", StageTimer())
+    original_load_image = model.load_image
+    model.load_image = timed(fetch, original_load_image)
+    start = time.perf_counter()
+    images = [(product, loaded) for product, loaded in model.iter_images(catalog, resize)
+              if not isinstance(loaded, Exception)]
+    fetch.seconds = time.perf_counter() - start
+    fetch.items = len(images)
+    model.load_image = original_load_image
+
+    # 2) 추론만 (미리 받은 이미지로 embed_image)
+    inference = stages.setdefault("inference", StageTimer())
+    start = time.perf_counter()
+    for _, (image, _) in images:
+        call_start = time.perf_counter()
+        model.embed_image(image)
+        inference.add_latency(time.perf_counter() - call_start)
+    inference.seconds = time.perf_counter() - start
+    inference.items = len(images)
+
+    # 3) embed_batch 전체 (다운로드와 추론이 겹쳐서 실행)
+    embed_batch = stages.setdefault("embed_batch", StageTimer())
+    start = time.perf_counter()
+    embeddings = model.embed_batch(catalog, resize, vector_as_list=False)
+    embed_batch.seconds = time.perf_counter() - start
+    embed_batch.items = len(embeddings)
+    return embeddings
+
+
+def random_embeddings(catalog: list, dimension: int, seed: int) -> list:
+    """--skip-embedding 일 때 쓰는 정규화된 랜덤 벡터"""
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((len(catalog), dimension)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return [{
+        "product_id": product[0],
+        "image_vector": vector,
+        "status": product[2],
+        "primary_category_id": product[3],
+        "secondary_category_id": product[4],
+    } for product, vector in zip(catalog, vectors)]
+
+
+def bench_repeated(timer: StageTimer, repeat: int, items: int, func):
+    """func를 repeat번 실행하고 실행당 지연시간, 전체 처리량 기록"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call_start = time.perf_counter()
+        func()
+        timer.add_latency(time.perf_counter() - call_start)
+    timer.seconds = time.perf_counter() - start
+    timer.items = items * repeat
+
+
+def create_scratch_schema(pg_url: str) -> tuple:
+    """
+    벤치마크 전용 스키마를 새로 만들고, 그 스키마를 먼저 찾는 search_path가 붙은 URL 반환
+    (VectorDBConnector의 product 테이블/인덱스가 전부 scratch 스키마에 생김)
+
+    :return: (스키마 이름, scratch URL)
+    """
+    from sqlalchemy import create_engine, make_url, text
+    schema = f"pipeline_bench_{os.getpid()}_{int(time.time())}"
+    engine = create_engine(pg_url)
+    try:
+        with engine.begin() as conn:
+            # 확장은 scratch 스키마가 아니라 기본 위치에 설치 (스키마를 지울 때 같이 지워지지 않도록)
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            conn.execute(text(f"CREATE SCHEMA {schema}"))
+    finally:
+        engine.dispose()
+    url = make_url(pg_url).update_query_dict({"options": f"-csearch_path={schema},public"})
+    return schema, url.render_as_string(hide_password=False)
+
+
+def drop_scratch_schema(pg_url: str, schema: str):
+    from sqlalchemy import create_engine, text
+    engine = create_engine(pg_url)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA IF EXISTS {schema} CASCADE"))
+    finally:
+        engine.dispose()
+
+
+def create_scratch_database(db_url: str, catalog: list) -> tuple:
+    """
+    벤치마크 전용 MySQL 데이터베이스에 product(id, status, similar_ids) 테이블을 만들고 카탈로그 행을 넣음
+    (update_similar_products_bulk의 UPDATE ... JOIN이 실제 행을 갱신하도록)
+
+    :return: (데이터베이스 이름, 그 데이터베이스를 가리키는 URL)
+    """
+    from sqlalchemy import create_engine, make_url, text
+    database = f"pipeline_bench_{os.getpid()}_{int(time.time())}"
+    engine = create_engine(db_url)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE DATABASE {database}"))
+            conn.execute(text(f"""
+                CREATE TABLE {database}.product (
+                    id          BIGINT PRIMARY KEY,
+                    status      VARCHAR(255),
+                    similar_ids JSON
+                )
+            """))
+            conn.execute(text(f"INSERT INTO {database}.product (id, status) VALUES (:id, :status)"),
+                         [{"id": product[0], "status": product[2]} for product in catalog])
+    finally:
+        engine.dispose()
+    return database, make_url(db_url).set(database=database).render_as_string(hide_password=False)
+
+
+def drop_scratch_database(db_url: str, database: str):
+    from sqlalchemy import create_engine, text
+    engine = create_engine(db_url)
+    try:
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP DATABASE IF EXISTS {database}"))
+    finally:
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding / extraction pipeline benchmark")
+    parser.add_argument('--products', type=int, default=500)
+    parser.add_argument('--categories', type=int, default=8)
+    parser.add_argument('--unique-images', type=int, default=100, help='Distinct image files behind the catalog')
+    parser.add_argument('--image-size', type=str, default='800x1000', help='Synthetic image WIDTHxHEIGHT')
+    parser.add_argument('--image-dir', type=str, default=None, help='Where to keep synthetic images (default: temp dir)')
+    parser.add_argument('--top-k', type=int, default=20)
+    parser.add_argument('--queries', type=int, default=100, help='Single-product similarity queries to time')
+    parser.add_argument('--repeat', type=int, default=3, help='Repetitions for the upsert / update stages')
+    parser.add_argument('--dimension', type=int, default=1024, help='Vector size with --skip-embedding')
+    parser.add_argument('--skip-embedding', action='store_true', help='Use random vectors instead of MediaPipe')
+    parser.add_argument('--pg', action='store_true', help='Use VectorDBConnector on an explicit PG_URL (scratch schema, dropped afterwards) instead of the in-memory stand-in')
+    parser.add_argument('--mysql', action='store_true', help='Time update_similar_products_bulk on an explicit DB_URL (scratch database, dropped afterwards)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=str, default=None, help='Write JSON here instead of stdout')
+    args = parser.parse_args()
+
+    pg_url = os.getenv('PG_URL')
+    if args.pg and not pg_url:
+        parser.error("--pg needs PG_URL pointing at a test database (PG_HOST/PG_* settings are not used)")
+    db_url = os.getenv('DB_URL')
+    if args.mysql and not db_url:
+        parser.error("--mysql needs DB_URL pointing at a test server (SSH_HOST/DB_* settings are not used)")
+
+    width, height = (int(v) for v in args.image_size.split("x"))
+    image_dir = args.image_dir or tempfile.mkdtemp(prefix="bench_images_")
+    file_names = generate_images(image_dir, args.unique_images, (width, height), args.seed)
+    server, base_url = serve_directory(image_dir)
+
+    stages = {}
+    skipped_stages = {}
+    schema = None
+    database = None
+    try:
+        catalog = build_catalog(base_url, file_names, args.products, args.categories, args.seed)
+
+        if args.pg:
+            schema, scratch_url = create_scratch_schema(pg_url)
+            os.environ['PG_URL'] = scratch_url
+            from db.vector_db_connector import VectorDBConnector
+            vector_db = VectorDBConnector()
+            vector_db.create_vector_table(args.dimension)
+        else:
+            vector_db = InMemoryVectorDB()
+
+        if args.skip_embedding:
+            embeddings = random_embeddings(catalog, args.dimension, args.seed)
+        else:
+            from model.registry import create_model
+            model = create_model("mediapipe", model_name="embedder.tflite")
+            embeddings = bench_embedding(model, catalog, (224, 224), stages)
+
+        if args.pg:
+            bench_repeated(stages.setdefault("upsert_embeddings", StageTimer()), args.repeat, len(embeddings),
+                           lambda: vector_db.upsert_embeddings_bulk(embeddings))
+        else:
+            vector_db.upsert_embeddings_bulk(embeddings)
+            skipped_stages["upsert_embeddings"] = "needs --pg (in-memory stand-in has no storage cost)"
+
+        product_ids = [product[0] for product in catalog]
+        query_timer = stages.setdefault("get_similar_products_single", StageTimer())
+        sample_ids = random.Random(args.seed).sample(product_ids, min(args.queries, len(product_ids)))
+        get_similar_products = timed(query_timer, vector_db.get_similar_products)
+        start = time.perf_counter()
+        for pid in sample_ids:
+            get_similar_products([pid], args.top_k)
+        query_timer.seconds = time.perf_counter() - start
+        query_timer.items = len(sample_ids)
+
+        batch_timer = stages.setdefault("get_similar_products_batch", StageTimer())
+        similar_products = {}
+        def run_batch():
+            similar_products.update(vector_db.get_similar_products(product_ids, args.top_k))
+        bench_repeated(batch_timer, 1, len(product_ids), run_batch)
+        vector_db.close()
+
+        if args.mysql:
+            database, scratch_url = create_scratch_database(db_url, catalog)
+            os.environ['DB_URL'] = scratch_url
+            from db.db_connector import DBConnector
+            mysql_db = DBConnector()
+            bench_repeated(stages.setdefault("update_similar_products", StageTimer()), args.repeat, len(similar_products),
+                           lambda: mysql_db.update_similar_products_bulk(similar_products))
+            mysql_db.close()
+        else:
+            skipped_stages["update_similar_products"] = "needs --mysql (in-memory stand-in has no storage cost)"
+    finally:
+        server.shutdown()
+        if schema or database:
+            from db.connection_manager import connection_manager
+            # 공유 풀의 커넥션이 남아 있으면 DROP이 기다리므로 먼저 정리
+            connection_manager.close()
+        if database:
+            drop_scratch_database(db_url, database)
+        if schema:
+            drop_scratch_schema(pg_url, schema)
+
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "stages": {name: timer.report() for name, timer in stages.items()},
+        "skipped_stages": skipped_stages,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+if __name__ == "__main__":
+    main()
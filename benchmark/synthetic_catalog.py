@@ -0,0 +1,68 @@
+import os
+import random
+import functools
+import threading
+import http.server
+from PIL import Image, ImageDraw
+
+def generate_images(image_dir: str, count: int, size: tuple = (800, 1000), seed: int = 0) -> list:
+    """
+    상품 사진 대신 쓸 랜덤 도형 JPEG 이미지 생성
+
+    :return: image_dir 기준 상대 파일명 리스트
+    """
+    os.makedirs(image_dir, exist_ok=True)
+    rng = random.Random(seed)
+    file_names = []
+    for i in range(count):
+        file_name = f"synthetic_{i}.jpg"
+        path = os.path.join(image_dir, file_name)
+        if not os.path.exists(path):
+            image = Image.new("RGB", size, tuple(rng.randint(180, 255) for _ in range(3)))
+            draw = ImageDraw.Draw(image)
+            for _ in range(rng.randint(3, 8)):
+                x0, y0 = rng.randint(0, size[0] - 1), rng.randint(0, size[1] - 1)
+                x1, y1 = rng.randint(x0, size[0]), rng.randint(y0, size[1])
+                color = tuple(rng.randint(0, 255) for _ in range(3))
+                if rng.random() < 0.5:
+                    draw.rectangle((x0, y0, x1, y1), fill=color)
+                else:
+                    draw.ellipse((x0, y0, x1, y1), fill=color)
+            image.save(path, format="JPEG", quality=90)
+        file_names.append(file_name)
+    return file_names
+
+class _QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+def serve_directory(directory: str) -> tuple:
+    """
+    directory를 로컬 HTTP 서버로 제공 (CDN 대용)
+
+    :return: (server, base_url) - 끝나면 server.shutdown() 호출
+    """
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def build_catalog(base_url: str, file_names: list, products: int, categories: int, seed: int = 0) -> list:
+    """
+    DBConnector.get_product_data()와 같은 형태의 합성 상품 목록
+
+    :return: [(id, image_url, status, primary_category_id, secondary_category_id), ...]
+    """
+    rng = random.Random(seed)
+    catalog = []
+    for product_id in range(1, products + 1):
+        category = rng.randrange(categories)
+        catalog.append((
+            product_id,
+            f"{base_url}/{rng.choice(file_names)}",
+            "SALE" if rng.random() < 0.9 else "SOLD",
+            category // 4 + 1,
+            category % 4 + 1,
+        ))
+    return catalog
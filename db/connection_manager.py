@@ -0,0 +1,98 @@
+import os
+import atexit
+import threading
+from sqlalchemy import create_engine, event
+
+class ConnectionManager:
+    """
+    프로세스 전체가 공유하는 SSH 터널/SQLAlchemy 엔진 관리자.
+
+    - 터널은 (SSH 호스트, 원격 주소)마다 처음 필요할 때 한 번만 열고, 로컬 포트를 고정해서
+      끊어지면 같은 포트로 다시 연결 (엔진 URL이 바뀌지 않음)
+    - 엔진은 URL마다 하나만 만들고 pool_pre_ping으로 죽은 커넥션을 걸러냄.
+      새 DBAPI 커넥션을 열기 직전마다 터널 상태를 확인해서 필요하면 재연결
+    - 커넥터의 close()는 공유 자원을 닫지 않고, 프로세스 종료 시(atexit) 한 번에 정리
+    """
+    def __init__(self):
+        self.ssh_port = int(os.getenv('SSH_PORT', 22))
+        # 아무 데이터도 오가지 않을 때 터널 keepalive 패킷 간격(초)
+        self.ssh_keepalive = float(os.getenv('SSH_KEEPALIVE', 30))
+
+        self._lock = threading.RLock()
+        # (ssh_host, ssh_username, ssh_pkey, remote_host, remote_port) -> SSHTunnelForwarder
+        self._tunnels = {}
+        # url -> Engine
+        self._engines = {}
+
+    def tunnel_port(self, ssh_host: str, ssh_username: str, ssh_pkey: str, remote_bind_address: tuple) -> int:
+        """
+        터널이 없거나 끊어졌으면 열고 로컬 포트 반환
+        :param remote_bind_address: (DB 호스트, DB 포트)
+        :return: 127.0.0.1 기준 로컬 포트
+        """
+        key = (ssh_host, ssh_username, ssh_pkey) + tuple(remote_bind_address)
+        with self._lock:
+            tunnel = self._tunnels.get(key)
+            if tunnel is not None and tunnel.is_active:
+                return tunnel.local_bind_port
+
+            local_bind_address = ('127.0.0.1', 0)
+            if tunnel is not None:
+                # 끊어진 터널은 같은 로컬 포트로 다시 열어서 기존 엔진을 그대로 사용
+                local_bind_address = ('127.0.0.1', tunnel.local_bind_port)
+                print(f"SSH tunnel to {ssh_host} is down, reconnecting on port {tunnel.local_bind_port}")
+                try:
+                    tunnel.stop()
+                except Exception as e:
+                    print(f"Error stopping SSH tunnel: {str(e)}")
+
+            # paramiko까지 끌고 오므로 터널이 필요할 때만 import (DB_URL/PG_URL 직접 연결이면 불필요)
+            from sshtunnel import SSHTunnelForwarder
+            tunnel = SSHTunnelForwarder(
+                (ssh_host, self.ssh_port),
+                ssh_username=ssh_username,
+                ssh_pkey=ssh_pkey,
+                remote_bind_address=tuple(remote_bind_address),
+                local_bind_address=local_bind_address,
+                set_keepalive=self.ssh_keepalive
+            )
+            tunnel.start()
+            self._tunnels[key] = tunnel
+            return tunnel.local_bind_port
+
+    def get_engine(self, url: str, tunnel: tuple = None, **engine_kwargs):
+        """
+        URL마다 하나의 공유 엔진 반환 (풀 설정은 처음 만든 호출자의 값을 사용)
+        :param url: SQLAlchemy URL
+        :param tunnel: URL이 SSH 터널 포트를 가리키면 tunnel_port()에 넘길 (ssh_host, ssh_username, ssh_pkey, remote_bind_address)
+        :param engine_kwargs: create_engine 인자 (pool_size 등)
+        """
+        with self._lock:
+            engine = self._engines.get(url)
+            if engine is not None:
+                return engine
+
+            engine = create_engine(url, pool_pre_ping=True, **engine_kwargs)
+            if tunnel is not None:
+                @event.listens_for(engine, "do_connect")
+                def ensure_tunnel(dialect, conn_rec, cargs, cparams):
+                    self.tunnel_port(*tunnel)
+
+            self._engines[url] = engine
+            return engine
+
+    def close(self):
+        """모든 엔진과 터널 종료 (프로세스 종료 시)"""
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose()
+            self._engines = {}
+            for tunnel in self._tunnels.values():
+                try:
+                    tunnel.stop()
+                except Exception as e:
+                    print(f"Error stopping SSH tunnel: {str(e)}")
+            self._tunnels = {}
+
+connection_manager = ConnectionManager()
+atexit.register(connection_manager.close)
@@ -1,6 +1,7 @@
 from db.db_connector import DBConnector
 from db.vector_db_connector import VectorDBConnector
-from model.mediapipe_embedding_model import MediaPipeEmbeddingModel
+from model.registry import create_model
+from util.metrics import metrics
 import os
 
 def main():
@@ -15,20 +16,22 @@ def main():
     try:
         id_list_str = ",".join(map(str, product_ids))
         where_condition = f"id IN ({id_list_str})"
-        product_datas = mysql_db.get_product_data(where_condition, 5000) 
+        product_datas = list(mysql_db.iter_product_data(where_condition))
     finally:
         mysql_db.close()
     
     # 2) 이미지 임베딩 생성
-    model = MediaPipeEmbeddingModel(model_name="embedder.tflite")
+    model = create_model("mediapipe", model_name="embedder.tflite")
     product_datas_with_embedding = model.embed_batch(product_datas, (224, 224))
 
     # 3) PGVector DBConnector를 통해 임베딩 저장
     vector_db = VectorDBConnector()
     try:
-        vector_db.upsert_embeddings(product_datas_with_embedding)
+        vector_db.upsert_embeddings_bulk(product_datas_with_embedding)
     finally:
         vector_db.close()
+    metrics.log_summary(products=len(product_datas), embedded=len(product_datas_with_embedding))
+    metrics.write_prometheus()
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,9 @@
 from db.db_connector import DBConnector
 from db.vector_db_connector import VectorDBConnector
-from model.mediapipe_embedding_model import MediaPipeEmbeddingModel
+from model.registry import create_model
+from util.embedding_pipeline import EmbeddingPipeline
+from util.checkpoint import CheckpointStore, add_checkpoint_arguments
+from util.metrics import metrics
 import time
 import argparse
 
@@ -8,27 +11,32 @@ def main():
     # 0) 임베딩할 Product가 생성된 날짜 지정해주기
     parser = argparse.ArgumentParser()
     parser.add_argument('--date', type=str, required=True, help='Date in YYYY-MM-DD format')
+    parser.add_argument('--chunk-size', type=int, default=None, help='Products per chunk (default PIPELINE_CHUNK_SIZE)')
+    parser.add_argument('--queue-size', type=int, default=None, help='Chunks buffered between stages (default PIPELINE_QUEUE_SIZE)')
+    add_checkpoint_arguments(parser)
     args = parser.parse_args()
     date = args.date
     
-    # 1) MySQL DB에서 특정 조건의 상품정보를 가져옴
+    # 1) MySQL 청크 읽기 -> 2) 이미지 임베딩 생성 -> 3) PGVector 저장 을 청크 단위로 겹쳐서 실행
+    where_condition = f"created_at LIKE '{date}%'"
+    model = create_model("mediapipe", model_name="embedder.tflite")
     mysql_db = DBConnector()
-    try:
-        where_condition = f"created_at LIKE '{date}%'"
-        product_datas = mysql_db.get_product_data(where_condition, 5000) 
-    finally:
-        mysql_db.close()
-    
-    # 2) 이미지 임베딩 생성
-    model = MediaPipeEmbeddingModel(model_name="embedder.tflite")
-    product_datas_with_embedding = model.embed_batch(product_datas, (224, 224))
-
-    # 3) PGVector DBConnector를 통해 임베딩 저장
     vector_db = VectorDBConnector()
+    # 청크마다 진행 상황 기록 (--resume 이면 같은 날짜의 미완료 실행을 이어서)
+    checkpoint = CheckpointStore()
+    run_id = checkpoint.start_run("embedding_current_products_daily", {"date": date}, args.run_id, args.resume)
+    print(f"Run id: {run_id}")
     try:
-        vector_db.upsert_embeddings(product_datas_with_embedding)
+        pipeline = EmbeddingPipeline(mysql_db, model, vector_db, args.chunk_size, args.queue_size, (224, 224),
+                                     checkpoint=checkpoint, run_id=run_id)
+        stats = pipeline.run(where_condition)
+        checkpoint.finish_run(run_id)
+        print(f"Embedding pipeline finished: {stats}")
     finally:
+        checkpoint.close()
         vector_db.close()
+        mysql_db.close()
+    metrics.write_prometheus()
 
 if __name__ == "__main__":
     main()
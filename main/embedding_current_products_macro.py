@@ -1,30 +1,38 @@
 from db.db_connector import DBConnector
 from db.vector_db_connector import VectorDBConnector
-from model.mediapipe_embedding_model import MediaPipeEmbeddingModel
+from model.registry import create_model
+from util.embedding_pipeline import EmbeddingPipeline
+from util.checkpoint import CheckpointStore, add_checkpoint_arguments
+from util.metrics import metrics
+import argparse
 import time
 
 def main():
+    parser = argparse.ArgumentParser()
+    add_checkpoint_arguments(parser)
+    args = parser.parse_args()
     
     date = '2025-01-29%'
+    where_condition = f"created_at LIKE '{date}%' and status = 'SALE'"
     
-    # 1) MySQL DB에서 특정 조건의 상품정보를 가져옴
+    # 1) MySQL 청크 읽기 -> 2) 이미지 임베딩 생성 -> 3) PGVector 저장 을 청크 단위로 실행하고 청크마다 진행 상황 기록
+    model = create_model("mediapipe", model_name="embedder.tflite")
     mysql_db = DBConnector()
-    try:
-        where_condition = f"created_at LIKE '{date}%' and status = 'SALE'"
-        product_datas = mysql_db.get_product_data(where_condition, 200) 
-    finally:
-        mysql_db.close()
-    
-    # 2) 이미지 임베딩 생성
-    model = MediaPipeEmbeddingModel(model_name="embedder.tflite")
-    product_datas_with_embedding = model.embed_batch(product_datas, (224, 224))
-
-    # 3) PGVector DBConnector를 통해 임베딩 저장
     vector_db = VectorDBConnector()
+    checkpoint = CheckpointStore()
+    run_id = checkpoint.start_run("embedding_current_products_macro", {"where": where_condition}, args.run_id, args.resume)
+    print(f"Run id: {run_id}")
     try:
-        vector_db.upsert_embeddings(product_datas_with_embedding)
+        pipeline = EmbeddingPipeline(mysql_db, model, vector_db, resize=(224, 224), checkpoint=checkpoint, run_id=run_id)
+        stats = pipeline.run(where_condition)
+        checkpoint.finish_run(run_id)
+        print(f"Embedding pipeline finished: {stats}")
     finally:
+        checkpoint.close()
         vector_db.close()
+        mysql_db.close()
+    metrics.log_summary(products=stats["read"], embedded=stats["embedded"])
+    metrics.write_prometheus()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,164 @@
+from db.db_connector import DBConnector
+from db.vector_db_connector import VectorDBConnector
+from model.registry import create_model
+from util.metrics import metrics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import socketserver
+import threading
+import argparse
+import json
+import time
+import os
+
+
+class EmbeddingService:
+    """
+    모델과 DB 커넥션을 한 번만 올려두고 상품 id 묶음 단위 요청을 처리하는 상주 서비스.
+    요청마다 임베딩 생성 -> PGVector 저장 -> 유사 상품 추출 -> MySQL 저장 까지 끝낸 뒤 응답.
+    """
+    def __init__(self, top_k: int = 100):
+        self.top_k = top_k
+        self.model = create_model("mediapipe", model_name="embedder.tflite")
+        self.mysql_db = DBConnector()
+        self.vector_db = VectorDBConnector()
+        # MediaPipe embedder는 스레드 안전하지 않으므로 임베딩 단계만 직렬화
+        self._model_lock = threading.Lock()
+
+    def process(self, product_ids: list, extract: bool = True, top_k: int = None) -> dict:
+        """
+        :param product_ids: 임베딩할 상품 id 리스트
+        :param extract: True면 유사 상품 리스트까지 갱신
+        :param top_k: 상품당 유사 상품 수
+        :return: 처리 결과 요약
+        """
+        started = time.perf_counter()
+        product_ids = [int(pid) for pid in product_ids]
+        if not product_ids:
+            return {"requested": 0, "embedded": 0, "failed": [], "similar_updated": 0, "seconds": 0.0}
+
+        id_list_str = ",".join(map(str, product_ids))
+        product_datas = list(self.mysql_db.iter_product_data(f"id IN ({id_list_str})"))
+
+        with self._model_lock:
+            embeddings = self.model.embed_batch(product_datas, (224, 224), vector_as_list=False)
+        self.vector_db.upsert_embeddings_bulk(embeddings)
+
+        embedded_ids = [item["product_id"] for item in embeddings]
+        similar_updated = 0
+        if extract and embedded_ids:
+            similar_products = self.vector_db.get_similar_products(embedded_ids, top_k=top_k or self.top_k)
+            similar_updated = self.mysql_db.update_similar_products_bulk(similar_products)
+
+        embedded_set = set(embedded_ids)
+        result = {
+            "requested": len(product_ids),
+            "embedded": len(embedded_ids),
+            "failed": [pid for pid in product_ids if pid not in embedded_set],
+            "similar_updated": similar_updated,
+            "seconds": round(time.perf_counter() - started, 3),
+        }
+        metrics.log_summary(batch="request", **result)
+        return result
+
+    def close(self):
+        self.model.close()
+        self.vector_db.close()
+        self.mysql_db.close()
+        metrics.write_prometheus()
+
+
+class EmbeddingRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /embed  {"product_ids": [1, 2, 3], "extract": true, "top_k": 100}  (형식이 틀리면 400)
+    GET  /health
+    """
+    service = None
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/embed":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise ValueError("request body must be a JSON object")
+            product_ids = body.get("product_ids", [])
+            if not isinstance(product_ids, list):
+                raise ValueError("product_ids must be a list")
+            # bool은 int의 하위 클래스라 따로 거름
+            if not all(isinstance(pid, int) and not isinstance(pid, bool) for pid in product_ids):
+                raise ValueError("product_ids must contain only integers")
+            top_k = body.get("top_k")
+            if top_k is not None and (not isinstance(top_k, int) or isinstance(top_k, bool) or top_k <= 0):
+                raise ValueError("top_k must be a positive integer")
+            extract = body.get("extract", True)
+            if not isinstance(extract, bool):
+                raise ValueError("extract must be a boolean")
+        except (ValueError, json.JSONDecodeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            result = self.service.process(product_ids, extract, top_k)
+        except Exception as e:
+            print(f"Error processing request {product_ids}: {str(e)}")
+            self._send_json(500, {"error": str(e)})
+            return
+        self._send_json(200, result)
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix 소켓이면 client_address가 비어 있음
+        return self.client_address[0] if self.client_address else "unix"
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def server_bind(self):
+        # 이전 실행에서 남은 소켓 파일 정리
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', type=str, default=os.getenv('EMBEDDING_SERVICE_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('EMBEDDING_SERVICE_PORT', 8765)))
+    parser.add_argument('--socket', type=str, default=os.getenv('EMBEDDING_SERVICE_SOCKET'), help='Listen on a Unix socket instead of TCP')
+    parser.add_argument('--top-k', type=int, default=100, help='Similar products per product')
+    args = parser.parse_args()
+
+    EmbeddingRequestHandler.service = EmbeddingService(top_k=args.top_k)
+    if args.socket:
+        server = ThreadingUnixHTTPServer(args.socket, EmbeddingRequestHandler)
+        print(f"Embedding service listening on unix:{args.socket}")
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), EmbeddingRequestHandler)
+        print(f"Embedding service listening on http://{args.host}:{args.port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        EmbeddingRequestHandler.service.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from db.vector_db_connector import VectorDBConnector
+from util.vector_snapshot import VectorSnapshot
+import argparse
+import time
+import os
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--dir', type=str, default=os.getenv('VECTOR_SNAPSHOT_DIR', './cache/vector_snapshot'),
+                        help='Snapshot directory')
+    parser.add_argument('--full', action='store_true', help='Re-export everything instead of an incremental refresh')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    pg_db = VectorDBConnector()
+    try:
+        if args.full or VectorSnapshot.read_manifest(args.dir) is None:
+            snapshot = VectorSnapshot.export(pg_db, args.dir)
+            print(f"Exported {len(snapshot)} vectors to {args.dir}")
+        else:
+            snapshot = VectorSnapshot(args.dir)
+            changed = snapshot.refresh(pg_db)
+            print(f"Refreshed {args.dir}: {changed} changed rows, {len(snapshot)} vectors")
+    finally:
+        pg_db.close()
+    print(f"Done in {time.perf_counter() - started:.1f}s (version {snapshot.manifest['version']})")
+
+if __name__ == "__main__":
+    main()
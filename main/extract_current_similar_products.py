@@ -1,7 +1,16 @@
 from db.vector_db_connector import VectorDBConnector
 from db.db_connector import DBConnector
+from util.similarity_engine import SimilarityEngine
+from util.metrics import metrics
+import asyncio
 import os
 
+async def get_similar_products_async(product_ids: list, top_k: int) -> dict:
+    """상품별 k-NN 쿼리를 asyncpg 커넥션 풀로 동시에 실행"""
+    from db.async_vector_db_connector import AsyncVectorDBConnector
+    async with AsyncVectorDBConnector() as pg_db:
+        return await pg_db.get_similar_products(product_ids, top_k=top_k)
+
 def main():
     extract_num = 100
     
@@ -12,13 +21,20 @@ def main():
     
     mysql_db = DBConnector()
     pg_db = VectorDBConnector()
+    # SIMILARITY_BACKEND=numpy 이면 카테고리별 벡터를 메모리에 올려서 계산, async 이면 상품별 쿼리를 동시에 실행
+    similarity_source = SimilarityEngine(pg_db) if os.getenv("SIMILARITY_BACKEND", "sql") == "numpy" else pg_db
     try:
-        similar_products = pg_db.get_similar_products(product_ids, top_k=extract_num)
-        mysql_db.update_similar_products(similar_products)
+        if os.getenv("SIMILARITY_BACKEND", "sql") == "async":
+            similar_products = asyncio.run(get_similar_products_async(product_ids, extract_num))
+        else:
+            similar_products = similarity_source.get_similar_products(product_ids, top_k=extract_num)
+        mysql_db.update_similar_products_bulk(similar_products)
     finally:
         # 연결 종료
         pg_db.close()
         mysql_db.close()
+    metrics.log_summary(products=len(product_ids))
+    metrics.write_prometheus()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
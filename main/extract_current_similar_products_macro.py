@@ -1,9 +1,21 @@
 from db.vector_db_connector import VectorDBConnector
 from db.db_connector import DBConnector
+from util.similarity_engine import SimilarityEngine
+from util.sharded_extraction import ShardedExtractor
+from util.checkpoint import CheckpointStore, add_checkpoint_arguments
+from util.metrics import metrics
+import argparse
 import os
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--shard-size', type=int, default=int(os.getenv('EXTRACT_SHARD_SIZE', 500)),
+                        help='Products per shard (0: one query per condition)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Shards extracted in parallel (default: EXTRACT_WORKERS, PG pool size or CPU count)')
+    add_checkpoint_arguments(parser)
+    args = parser.parse_args()
     
     # check = True
     check = False
@@ -28,37 +40,71 @@ def main():
         "similar_ids like '[]' and status = 'SALE'"
     ]
 
-    for condition in new_conditions:
-        mysql_db = DBConnector()
-        pg_db = VectorDBConnector()
-        try:
+    # 커넥터(SSH 터널, 커넥션 풀)는 모든 조건/샤드가 공유
+    mysql_db = DBConnector()
+    pg_db = VectorDBConnector()
+    # SIMILARITY_BACKEND=numpy 이면 카테고리별 벡터를 메모리에 올려서 계산
+    use_numpy = os.getenv("SIMILARITY_BACKEND", "sql") == "numpy"
+    similarity_source = SimilarityEngine(pg_db) if use_numpy else pg_db
+    # numpy는 행렬곱이 GIL을 풀어서 CPU 수만큼, SQL은 PG 커넥션 풀 크기만큼 동시에 실행
+    workers = args.workers or int(os.getenv('EXTRACT_WORKERS', (os.cpu_count() or 1) if use_numpy else pg_db.pool_size))
+    # 샤드(또는 조건)마다 진행 상황 기록 (--resume 이면 끝난 샤드는 건너뜀)
+    checkpoint = CheckpointStore()
+    run_id = checkpoint.start_run("extract_current_similar_products_macro",
+                                  {"conditions": new_conditions, "top_k": extract_num, "shard_size": args.shard_size},
+                                  args.run_id, args.resume)
+    print(f"Run id: {run_id}")
+    failed = 0
+    try:
+        for condition in new_conditions:
             print("Current Condition is...")
             print(condition)
             print("\n")
-            
-            product_ids = mysql_db.get_product_ids_by_condition(condition)
-            print("check1\n")
-            similar_products = pg_db.get_similar_products(product_ids, top_k=extract_num)
-            print("check2\n")
-            mysql_db.update_similar_products(similar_products)
-            print("check3\n")
-            # if check == True:
-            #     print(product_ids)
-            #     print("\n")
-            #     print(similar_products)
-            #     print("\n")
-            #     for product_id in product_ids:
-            #         print(f"Product ID: {product_id}")
-            #         print("Similar Products with Links:")
-            #         for similar_id in similar_products.get(product_id, []): 
-            #             similar_product_links = mysql_db.find_links_by_id(similar_id)
-            #             if similar_product_links:
-            #                 for link in similar_product_links:
-            #                     print(f"- Link: {link}")
-            #         print("\n")
-        finally:
-            pg_db.close()
-            mysql_db.close()
+
+            if args.shard_size > 0:
+                with metrics.timer("mysql_read"):
+                    products = mysql_db.get_product_categories_by_condition(condition)
+                extractor = ShardedExtractor(similarity_source, mysql_db, top_k=extract_num,
+                                             workers=workers, shard_size=args.shard_size,
+                                             checkpoint=checkpoint, run_id=run_id)
+                stats = extractor.run(products, stage=f"extracted:{condition}")
+                failed += stats["failed_shards"]
+                print(f"Updated similar products: {stats['updated']} / {len(products)} "
+                      f"({stats['shards']} shards, {stats['skipped_shards']} already done, {stats['failed_shards']} failed)\n")
+                metrics.log_summary(batch=condition, **stats)
+            elif condition in checkpoint.done_keys(run_id, "extracted"):
+                print("Already done in this run\n")
+            else:
+                with metrics.timer("mysql_read"):
+                    product_ids = mysql_db.get_product_ids_by_condition(condition)
+                with metrics.timer("extract"):
+                    similar_products = similarity_source.get_similar_products(product_ids, top_k=extract_num)
+                mysql_db.update_similar_products_bulk(similar_products)
+                checkpoint.mark_done(run_id, "extracted", None, None, len(product_ids), chunk_key=condition)
+                print(f"Updated similar products: {len(similar_products)} / {len(product_ids)}\n")
+                metrics.log_summary(batch=condition, products=len(product_ids), updated=len(similar_products))
+                # if check == True:
+                #     print(product_ids)
+                #     print("\n")
+                #     print(similar_products)
+                #     print("\n")
+                #     for product_id in product_ids:
+                #         print(f"Product ID: {product_id}")
+                #         print("Similar Products with Links:")
+                #         for similar_id in similar_products.get(product_id, []): 
+                #             similar_product_links = mysql_db.find_links_by_id(similar_id)
+                #             if similar_product_links:
+                #                 for link in similar_product_links:
+                #                     print(f"- Link: {link}")
+                #         print("\n")
+        # 실패한 샤드가 있으면 --resume 으로 그 샤드만 다시 실행할 수 있게 미완료로 남겨둠
+        if failed == 0:
+            checkpoint.finish_run(run_id)
+    finally:
+        checkpoint.close()
+        pg_db.close()
+        mysql_db.close()
+    metrics.write_prometheus()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,5 +1,6 @@
 from db.vector_db_connector import VectorDBConnector
 from db.db_connector import DBConnector
+from util.similarity_engine import SimilarityEngine
 import os
 
 
@@ -13,6 +14,8 @@ def main():
 
     mysql_db = DBConnector()
     pg_db = VectorDBConnector()
+    # SIMILARITY_BACKEND=numpy 이면 카테고리별 벡터를 메모리에 올려서 계산
+    similarity_source = SimilarityEngine(pg_db) if os.getenv("SIMILARITY_BACKEND", "sql") == "numpy" else pg_db
     try:
         print("Current Condition is...")
         print(condition)
@@ -21,10 +24,10 @@ def main():
         print("check1\n")
         print(product_ids)
 
-        similar_products = pg_db.get_similar_products(product_ids, top_k=extract_num)
+        similar_products = similarity_source.get_similar_products(product_ids, top_k=extract_num)
         print("check2\n")
         print(similar_products)
-        mysql_db.update_similar_products(similar_products)
+        mysql_db.update_similar_products_bulk(similar_products)
         print("check3\n")
         if check == True:
             print("\n")
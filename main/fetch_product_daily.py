@@ -0,0 +1,162 @@
+from db.vector_db_connector import VectorDBConnector
+from db.db_connector import DBConnector
+import argparse
+import json
+import os
+
+
+def load_last_run(state_path: str) -> str:
+    """이전 실행 시각 (없으면 None)"""
+    if not os.path.exists(state_path):
+        return None
+    with open(state_path, "r") as f:
+        return json.load(f).get("last_run")
+
+
+def save_last_run(state_path: str, last_run: str):
+    os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+    tmp_path = state_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"last_run": last_run}, f)
+    os.replace(tmp_path, state_path)
+
+
+def find_products_to_reextract(mysql_db: DBConnector, sold_ids: set, threshold: int) -> dict:
+    """
+    새로 팔린 상품이 유사 상품 리스트에 들어있는 SALE 상품 중,
+    리스트 안의 팔린 상품 수가 threshold 이상인 상품
+
+    :return: { 상품 id: 현재 리스트 길이 }
+    """
+    if not sold_ids:
+        return {}
+    affected = mysql_db.get_similar_ids_containing(sold_ids)
+    neighbor_ids = {similar_id for similar_list in affected.values() for similar_id in similar_list}
+    statuses = mysql_db.get_statuses(neighbor_ids)
+
+    reextract = {}
+    for product_id, similar_list in affected.items():
+        sold_count = sum(1 for similar_id in similar_list if statuses.get(similar_id) != 'SALE')
+        if sold_count >= threshold:
+            reextract[product_id] = len(similar_list)
+    return reextract
+
+
+def merge_new_neighbors(mysql_db: DBConnector, pg_db: VectorDBConnector, new_neighbors: dict,
+                        skip_ids: set, top_k: int) -> dict:
+    """
+    새 상품의 k-NN 결과를 뒤집어서, 기존 상품 리스트의 마지막 상품과의 거리보다 가까운 새 상품만 끼워 넣음
+    저장된 리스트는 길이와 상관없이 그 길이만큼의 top-L로 봄 (extract 매크로가 쓴 20개짜리 리스트도
+    top_k보다 짧다고 먼 새 상품을 뒤에 붙이지 않음). 빈 리스트에는 그대로 넣음
+
+    :param new_neighbors: { 새 상품 id: [(기존 상품 id, distance), ...] }
+    :param skip_ids: 이미 새로 추출했거나 새로 추가된 상품 id (갱신 대상에서 제외)
+    :param top_k: top_k보다 짧은 리스트는 끼워 넣은 만큼 top_k까지 늘어나고, top_k 이상인 리스트는 길이를 유지
+    :return: 리스트가 바뀐 상품들의 { 상품 id: [similar_id, ...] }
+    """
+    # 기존 상품 -> [(새 상품 id, distance), ...]
+    candidates = {}
+    for new_id, neighbors in new_neighbors.items():
+        for product_id, distance in neighbors:
+            if product_id not in skip_ids:
+                candidates.setdefault(product_id, []).append((new_id, distance))
+    if not candidates:
+        return {}
+
+    current_lists = mysql_db.get_similar_ids(candidates.keys())
+
+    # 리스트의 마지막 상품과의 거리와 비교
+    last_pairs = [(product_id, similar_list[-1]) for product_id, similar_list in current_lists.items() if similar_list]
+    last_distances = pg_db.get_pair_distances(last_pairs)
+
+    winners = {}
+    for product_id, new_items in candidates.items():
+        similar_list = current_lists.get(product_id)
+        if similar_list is None:
+            continue
+        if similar_list:
+            last_distance = last_distances.get((product_id, similar_list[-1]))
+            if last_distance is None:
+                continue
+            new_items = [(new_id, distance) for new_id, distance in new_items if distance < last_distance]
+        if new_items:
+            winners[product_id] = new_items
+    if not winners:
+        return {}
+
+    # 바뀌는 리스트만 기존 상품들과의 거리를 구해서 다시 정렬
+    existing_pairs = [(product_id, similar_id) for product_id in winners for similar_id in current_lists[product_id]]
+    existing_distances = pg_db.get_pair_distances(existing_pairs)
+
+    updated = {}
+    for product_id, new_items in winners.items():
+        merged = [(similar_id, existing_distances[(product_id, similar_id)])
+                  for similar_id in current_lists[product_id]
+                  if (product_id, similar_id) in existing_distances]
+        merged_ids = {similar_id for similar_id, _ in merged}
+        merged.extend(item for item in new_items if item[0] not in merged_ids)
+        merged.sort(key=lambda item: item[1])
+        # 기존 리스트보다 짧게 자르지 않음
+        limit = max(top_k, len(current_lists[product_id]))
+        updated[product_id] = [similar_id for similar_id, _ in merged[:limit]]
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--since', type=str, default=None, help='Process changes since this datetime (default: last run)')
+    parser.add_argument('--top-k', type=int, default=100,
+                        help='Similar products per product (same as extract_current_similar_products / embedding_service)')
+    parser.add_argument('--threshold', type=int, default=int(os.getenv('SOLD_NEIGHBOR_THRESHOLD', 5)),
+                        help='Re-extract a list once this many of its products are sold')
+    args = parser.parse_args()
+
+    state_path = os.getenv('FETCH_DAILY_STATE_PATH', './state/fetch_product_daily.json')
+    since = args.since or load_last_run(state_path)
+    if since is None:
+        print("No previous run found. Pass --since YYYY-MM-DD for the first run.")
+        return
+
+    mysql_db = DBConnector()
+    pg_db = VectorDBConnector()
+    try:
+        # 다음 실행의 since: updated_at/created_at과 같은 시계(MySQL NOW())로, 처리 시작 전에 읽음
+        run_started = mysql_db.get_current_time()
+        if not mysql_db.has_similar_ids_index():
+            print("similar_ids index is missing, sold-neighbor lookup will scan the whole table. "
+                  "Run python -m main.migrate_similar_ids_index once.")
+
+        # 1) 오늘 상태가 바뀐 상품 status를 PG에 반영
+        changed = mysql_db.get_products_changed_since(since)
+        pg_db.update_statuses(dict(changed))
+        sold_ids = {product_id for product_id, status in changed if status != 'SALE'}
+        print(f"Changed products: {len(changed)}, sold: {len(sold_ids)}")
+
+        # 2) 팔린 유사 상품이 threshold 이상인 리스트만 다시 추출
+        reextract = find_products_to_reextract(mysql_db, sold_ids, args.threshold)
+        reextract_ids = list(reextract)
+        # 저장된 리스트보다 짧게 다시 뽑지 않도록 가장 긴 리스트 길이 이상으로 추출
+        reextract_top_k = max([args.top_k] + list(reextract.values()))
+        reextracted = pg_db.get_similar_products(reextract_ids, top_k=reextract_top_k)
+        mysql_db.update_similar_products_bulk(reextracted)
+        print(f"Re-extracted lists: {len(reextracted)}")
+
+        # 3) 새로 임베딩된 상품의 리스트 생성 + 기존 리스트에 더 가까운 새 상품 끼워 넣기
+        new_ids = mysql_db.get_product_ids_by_condition("created_at >= :since AND status = 'SALE'", {"since": since})
+        new_neighbors = pg_db.get_similar_products(new_ids, top_k=args.top_k, with_distance=True)
+        mysql_db.update_similar_products_bulk({
+            product_id: [similar_id for similar_id, _ in neighbors]
+            for product_id, neighbors in new_neighbors.items()
+        })
+        merged = merge_new_neighbors(mysql_db, pg_db, new_neighbors,
+                                     set(reextract_ids) | set(new_ids), args.top_k)
+        mysql_db.update_similar_products_bulk(merged)
+        print(f"New products: {len(new_neighbors)}, lists updated with new products: {len(merged)}")
+    finally:
+        pg_db.close()
+        mysql_db.close()
+
+    save_last_run(state_path, run_started)
+
+if __name__ == "__main__":
+    main()
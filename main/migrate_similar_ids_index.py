@@ -0,0 +1,15 @@
+from db.db_connector import DBConnector
+
+def main():
+    mysql_db = DBConnector()
+    try:
+        created = mysql_db.create_similar_ids_index()
+    finally:
+        mysql_db.close()
+    if created:
+        print(f"Created {DBConnector.SIMILAR_IDS_INDEX} on product.similar_ids")
+    else:
+        print(f"{DBConnector.SIMILAR_IDS_INDEX} already exists")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+from db.vector_db_connector import VectorDBConnector
+
+def main():
+    pg_db = VectorDBConnector()
+    try:
+        added = pg_db.migrate_updated_at()
+    finally:
+        pg_db.close()
+    if added:
+        print("Added product.updated_at. Run python -m main.export_vector_snapshot --full once to start incremental refreshes.")
+    else:
+        print("product.updated_at already exists")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+from db.vector_db_connector import VectorDBConnector
+import argparse
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--index-type', type=str, choices=['hnsw', 'ivfflat'], default=None,
+                        help='ANN index type (default: PG_INDEX_TYPE)')
+    parser.add_argument('--maintenance-work-mem', type=str, default=None,
+                        help="maintenance_work_mem for the build, e.g. 2GB (default: PG_MAINTENANCE_WORK_MEM or server setting)")
+    args = parser.parse_args()
+
+    pg_db = VectorDBConnector()
+    index_type = args.index_type or pg_db.index_type
+    try:
+        created = pg_db.create_vector_index(index_type, args.maintenance_work_mem)
+    finally:
+        pg_db.close()
+    if created:
+        print(f"Created product_image_vector_{index_type}_idx on product.image_vector")
+    else:
+        print(f"product_image_vector_{index_type}_idx already exists")
+
+if __name__ == "__main__":
+    main()
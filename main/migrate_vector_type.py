@@ -0,0 +1,21 @@
+from db.vector_db_connector import VectorDBConnector
+import argparse
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--to', type=str, choices=list(VectorDBConnector.VECTOR_TYPES), default='halfvec',
+                        help='Target image_vector column type')
+    args = parser.parse_args()
+
+    pg_db = VectorDBConnector()
+    try:
+        migrated = pg_db.migrate_vector_type(args.to)
+    finally:
+        pg_db.close()
+    if migrated:
+        print(f"Converted {migrated} vectors to {args.to}. Set PG_VECTOR_TYPE={args.to} for later runs.")
+    else:
+        print(f"image_vector is already {args.to}")
+
+if __name__ == "__main__":
+    main()
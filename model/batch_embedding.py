@@ -0,0 +1,29 @@
+import numpy as np
+import torch
+from model.image_preprocessing import load_image_file
+
+def embed_images_batched(images: list, extract_features, decode_size: tuple, dimension: int,
+                         batch_size: int = 32) -> np.ndarray:
+    """
+    Shared batching loop for the transformers image models (CLIP / BLIP).
+
+    :param images: image paths, PIL images or uint8 RGB arrays
+    :param extract_features: model-specific call, list of images -> (batch, dim) feature tensor
+    :param decode_size: JPEG reduced-scale decode target for image paths
+    :param dimension: embedding size (shape of the empty result)
+    :param batch_size: images per forward pass
+    :return: (len(images), dim) L2-normalized float32 matrix
+    """
+    embeddings = []
+    with torch.inference_mode():
+        for start in range(0, len(images), batch_size):
+            batch = [
+                load_image_file(image, decode_size) if isinstance(image, str) else image
+                for image in images[start:start + batch_size]
+            ]
+            features = extract_features(batch)
+            features = torch.nn.functional.normalize(features, p=2, dim=-1)
+            embeddings.append(features.to(torch.float32).numpy())
+    if not embeddings:
+        return np.empty((0, dimension), dtype=np.float32)
+    return np.concatenate(embeddings)
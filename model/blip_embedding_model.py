@@ -1,13 +1,19 @@
 from transformers import BlipProcessor, BlipModel
 from PIL import Image
 import numpy as np
+from model.batch_embedding import embed_images_batched
 import torch
 
 class BLIPEmbeddingModel:
     def __init__(self, model_name: str):
         # Load model and processor from the local or remote path
         self.model = BlipModel.from_pretrained(model_name)
+        self.model.eval()
         self.processor = BlipProcessor.from_pretrained(model_name)
+        # JPEG reduced-scale decode target: no smaller than what the processor resizes to
+        size = self.processor.image_processor.size
+        edge = max(size.get("height", 384), size.get("width", 384))
+        self.decode_size = (edge, edge)
 
     def get_image_embedding(self, image_path: str) -> np.ndarray:
         """
@@ -19,3 +25,18 @@ class BLIPEmbeddingModel:
             outputs = self.model.get_image_features(**inputs)
         embedding = outputs.numpy().squeeze()
         return embedding / np.linalg.norm(embedding)
+
+    def embed_batch(self, images: list, batch_size: int = 32) -> np.ndarray:
+        """
+        Get embeddings for many images with batched forward passes
+
+        :param images: image paths, PIL images or uint8 RGB arrays
+        :param batch_size: images per forward pass
+        :return: (len(images), dim) L2-normalized float32 matrix
+        """
+        return embed_images_batched(images, self._image_features, self.decode_size,
+                                    self.model.config.projection_dim, batch_size)
+
+    def _image_features(self, batch: list) -> torch.Tensor:
+        inputs = self.processor(images=batch, return_tensors="pt")
+        return self.model.get_image_features(**inputs)
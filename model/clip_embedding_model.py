@@ -2,20 +2,42 @@ from PIL import Image
 from transformers import CLIPProcessor, CLIPModel
 import torch
 import numpy as np
+from model.batch_embedding import embed_images_batched
 class CLIPEmbeddingModel:
     def __init__(self, model_name="openai/clip-vit-base-patch32"):
         # Load model and processor
         self.model = CLIPModel.from_pretrained(model_name)
+        self.model.eval()
         self.processor = CLIPProcessor.from_pretrained(model_name)
+        # JPEG reduced-scale decode target: no smaller than what the processor resizes to
+        size = self.processor.image_processor.size
+        edge = size.get("shortest_edge", 224)
+        self.decode_size = (edge, edge)
 
     def get_image_embedding(self, image_path: str) -> np.ndarray:
         image = Image.open(image_path)
         inputs = self.processor(images=image, return_tensors="pt")
-        outputs = self.model.get_image_features(**inputs)
+        with torch.no_grad():
+            outputs = self.model.get_image_features(**inputs)
         outputs = outputs.detach().numpy().squeeze()
         return outputs
 
+    def embed_batch(self, images: list, batch_size: int = 32) -> np.ndarray:
+        """
+        Embed many images with batched forward passes.
+
+        :param images: image paths, PIL images or uint8 RGB arrays
+        :param batch_size: images per forward pass
+        :return: (len(images), dim) L2-normalized float32 matrix
+        """
+        return embed_images_batched(images, self._image_features, self.decode_size,
+                                    self.model.config.projection_dim, batch_size)
+
+    def _image_features(self, batch: list) -> torch.Tensor:
+        inputs = self.processor(images=batch, return_tensors="pt")
+        return self.model.get_image_features(**inputs)
+
     def get_text_embedding(self, text: str) -> torch.Tensor:
         inputs = self.processor(text=[text], return_tensors="pt", padding=True)
         outputs = self.model.get_text_features(**inputs)
-        return outputs 
\ No newline at end of file
+        return outputs 
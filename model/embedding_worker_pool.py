@@ -0,0 +1,119 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# 워커 프로세스마다 한 번만 만드는 embedder
+_worker_embedder = None
+
+def _init_worker(model_path: str):
+    """워커 프로세스 시작 시 tflite 모델을 한 번만 로드"""
+    global _worker_embedder
+    from mediapipe.tasks import python
+    from mediapipe.tasks.python import vision
+
+    base_options = python.BaseOptions(model_asset_path=model_path)
+    options = vision.ImageEmbedderOptions(
+        base_options=base_options,
+        l2_normalize=True
+    )
+    _worker_embedder = vision.ImageEmbedder.create_from_options(options)
+
+def _embed_shared_chunk(shm_name: str, shape: tuple, start: int, end: int) -> np.ndarray:
+    """
+    공유 메모리에 올라간 이미지 배열 중 [start, end) 구간을 임베딩
+    실패한 이미지는 NaN 행으로 반환
+    """
+    import mediapipe as mp
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        images = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        vectors = []
+        for i in range(start, end):
+            try:
+                mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=images[i])
+                embedding_result = _worker_embedder.embed(mp_image)
+                vectors.append(np.asarray(embedding_result.embeddings[0].embedding, dtype=np.float32))
+            except Exception:
+                vectors.append(None)
+        # 공유 메모리를 참조하는 배열을 지운 뒤 close 해야 함
+        del images
+    finally:
+        shm.close()
+
+    dimension = next((len(v) for v in vectors if v is not None), 0)
+    result = np.full((end - start, dimension), np.nan, dtype=np.float32)
+    for i, vector in enumerate(vectors):
+        if vector is not None:
+            result[i] = vector
+    return result
+
+class EmbeddingWorkerPool:
+    """
+    MediaPipe 추론을 여러 프로세스로 나눠 실행하는 워커 풀.
+    각 워커는 시작할 때 embedder를 한 번 만들고, 이미지는 pickle 대신 공유 메모리로 전달받음.
+    """
+    def __init__(self, model_path: str, processes: int = None, chunk_size: int = None):
+        """
+        :param model_path: tflite 모델 경로
+        :param processes: 워커 프로세스 수 (기본값 EMBEDDING_PROCESSES, 없으면 CPU 코어 수)
+        :param chunk_size: 워커 한 번 호출에 넘기는 이미지 수 (기본값 EMBEDDING_CHUNK_SIZE)
+        """
+        self.model_path = model_path
+        self.processes = processes or int(os.getenv('EMBEDDING_PROCESSES', os.cpu_count() or 1))
+        self.chunk_size = chunk_size or int(os.getenv('EMBEDDING_CHUNK_SIZE', 32))
+
+        # mediapipe 내부 스레드가 있는 상태에서 fork하지 않도록 spawn 사용
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_path,)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def embed_arrays(self, images: list) -> np.ndarray:
+        """
+        같은 크기의 uint8 RGB 이미지 배열들을 임베딩
+
+        :param images: List[np.ndarray (H, W, 3)]
+        :return: (len(images), dimension) float32 배열, 실패한 이미지는 NaN 행
+        """
+        if not images:
+            return np.empty((0, 0), dtype=np.float32)
+
+        shape = (len(images),) + images[0].shape
+        shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        try:
+            shared = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+            for i, image in enumerate(images):
+                shared[i] = image
+            del shared
+
+            futures = [
+                self.executor.submit(_embed_shared_chunk, shm.name, shape, start, min(start + self.chunk_size, len(images)))
+                for start in range(0, len(images), self.chunk_size)
+            ]
+            chunks = [future.result() for future in futures]
+        finally:
+            shm.close()
+            shm.unlink()
+
+        dimension = max(chunk.shape[1] for chunk in chunks)
+        result = np.full((len(images), dimension), np.nan, dtype=np.float32)
+        offset = 0
+        for chunk in chunks:
+            if chunk.shape[1]:
+                result[offset:offset + len(chunk)] = chunk
+            offset += len(chunk)
+        return result
+
+    def close(self):
+        self.executor.shutdown(wait=True)
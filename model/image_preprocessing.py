@@ -0,0 +1,139 @@
+import os
+from io import BytesIO
+import numpy as np
+from PIL import Image
+
+# 악성/비정상 이미지 방어용 상한
+MAX_IMAGE_BYTES = int(os.getenv('IMAGE_MAX_BYTES', 30 * 1024 * 1024))
+MAX_IMAGE_PIXELS = int(os.getenv('IMAGE_MAX_PIXELS', 50_000_000))
+
+# 전처리 결과(픽셀 값)가 달라지는 변경마다 올림. 이미지/임베딩 캐시 키에 들어가서 이전 방식의 결과를 재사용하지 않음
+# letterbox1: draft 디코딩 + LANCZOS 한 번 리사이즈 (이전 resize + ImageOps.pad 두 번 리사이즈와 벡터가 조금 다름)
+PREPROCESS_VERSION = "letterbox1"
+
+def open_image(data: bytes) -> Image.Image:
+    """
+    이미지 바이트를 디코딩 전 단계까지만 열고 크기를 검사
+
+    :param data: 원본 이미지 바이트
+    :return: 아직 디코딩하지 않은 PIL Image (lazy)
+    """
+    if len(data) > MAX_IMAGE_BYTES:
+        raise ValueError(f"Image too large: {len(data)} bytes (limit {MAX_IMAGE_BYTES})")
+    image = Image.open(BytesIO(data))
+    width, height = image.size
+    if width <= 0 or height <= 0 or width * height > MAX_IMAGE_PIXELS:
+        raise ValueError(f"Image dimensions not allowed: {width}x{height} (limit {MAX_IMAGE_PIXELS} pixels)")
+    return image
+
+def decode_image(image, target_size: tuple = (224, 224)) -> tuple:
+    """
+    letterbox()의 디코딩 단계: 픽셀을 실제로 읽어 RGB로 변환 (open_image()는 헤더만 읽음)
+    JPEG는 draft 모드로 목표 크기 이상인 가장 작은 1/2^n 스케일로 디코딩해서 디코딩 비용 자체를 줄임
+
+    :param image: 원본 이미지 바이트 또는 PIL Image
+    :param target_size: (width, height)
+    :return: (디코딩된 RGB PIL Image, 비율을 유지해 target_size 안에 맞춘 (width, height))
+    """
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        image = open_image(bytes(image))
+    target_width, target_height = target_size
+
+    # 리사이즈 크기는 draft로 줄어들기 전 원본 크기 기준
+    original_width, original_height = image.size
+    scale = min(target_width / original_width, target_height / original_height)
+    new_width = max(1, min(target_width, round(original_width * scale)))
+    new_height = max(1, min(target_height, round(original_height * scale)))
+
+    if image.format == "JPEG":
+        image.draft("RGB", (new_width, new_height))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image.load()
+    return image, (new_width, new_height)
+
+def resize_pad(image: Image.Image, size: tuple, target_size: tuple = (224, 224), out: np.ndarray = None) -> np.ndarray:
+    """
+    letterbox()의 리사이즈 단계: decode_image() 결과를 size로 한 번 리사이즈하고 가운데에 두고 남는 부분은 검은색 패딩
+
+    :param image: decode_image()가 반환한 RGB PIL Image
+    :param size: decode_image()가 반환한 (width, height)
+    :param target_size: (width, height)
+    :param out: 결과를 쓸 (height, width, 3) uint8 버퍼 (재사용용, 없으면 새로 생성)
+    :return: (height, width, 3) uint8 배열
+    """
+    target_width, target_height = target_size
+    new_width, new_height = size
+    # reducing_gap: 큰 이미지는 먼저 정수배 축소 후 LANCZOS (화질 차이는 거의 없음)
+    resized = image.resize((new_width, new_height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+    if out is None:
+        out = np.zeros((target_height, target_width, 3), dtype=np.uint8)
+    else:
+        out.fill(0)
+    left = (target_width - new_width) // 2
+    top = (target_height - new_height) // 2
+    out[top:top + new_height, left:left + new_width] = np.asarray(resized)
+    return out
+
+def letterbox(image, target_size: tuple = (224, 224), out: np.ndarray = None) -> np.ndarray:
+    """
+    비율을 유지하며 target_size 안에 맞게 한 번만 리사이즈하고, 남는 부분은 검은색 패딩으로 채운 RGB 배열 생성
+    (decode_image() + resize_pad(), 단계별로 시간을 재야 하면 두 함수를 따로 호출)
+
+    :param image: 원본 이미지 바이트 또는 PIL Image
+    :param target_size: (width, height)
+    :param out: 결과를 쓸 (height, width, 3) uint8 버퍼 (재사용용, 없으면 새로 생성)
+    :return: (height, width, 3) uint8 배열 (mp.Image / CLIP / BLIP 프로세서에 그대로 전달 가능)
+    """
+    image, size = decode_image(image, target_size)
+    return resize_pad(image, size, target_size, out)
+
+def load_image_file(path: str, min_size: tuple = (224, 224)) -> np.ndarray:
+    """
+    파일에서 이미지를 읽어 RGB 배열로 반환 (letterbox 없이, CLIP/BLIP 프로세서 입력용)
+    JPEG는 min_size 이상을 유지하는 축소 스케일로 디코딩
+
+    :param path: 이미지 파일 경로
+    :param min_size: (width, height) 디코딩 후 최소 크기
+    :return: (height, width, 3) uint8 배열
+    """
+    with open(path, "rb") as f:
+        image = open_image(f.read())
+    if image.format == "JPEG":
+        image.draft("RGB", min_size)
+    return np.asarray(image.convert("RGB"))
+
+def dhash(image, hash_size: int = 8) -> int:
+    """
+    difference hash: 흑백 (hash_size + 1) x hash_size 썸네일에서 가로로 이웃한 픽셀 밝기 비교
+    재압축/리사이즈 정도만 다른 같은 사진은 해밍 거리가 0~2 정도로 나옴
+
+    :param image: letterbox() 결과 uint8 RGB 배열 또는 PIL Image
+    :return: hash_size * hash_size 비트 정수
+    """
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    thumbnail = np.asarray(image.convert("L").resize((hash_size + 1, hash_size), Image.Resampling.BOX), dtype=np.int16)
+    bits = (thumbnail[:, 1:] > thumbnail[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+def color_signature(image, grid: int = 4) -> int:
+    """
+    dhash는 흑백이라 색만 다른 같은 디자인(컬러웨이)을 구분하지 못하므로 색 정보를 따로 요약
+    grid x grid 칸마다 RGB 평균 (재압축/리사이즈로는 칸마다 0~1 정도만 변하고, 색을 바꾼 사진은 몇십씩 변함)
+
+    :param image: letterbox() 결과 uint8 RGB 배열 또는 PIL Image
+    :return: grid * grid * 3 바이트를 이어 붙인 정수
+    """
+    if isinstance(image, np.ndarray):
+        image = Image.fromarray(image)
+    means = np.asarray(image.convert("RGB").resize((grid, grid), Image.Resampling.BOX), dtype=np.uint8)
+    return int.from_bytes(means.tobytes(), "big")
+
+def perceptual_hash(image, hash_size: int = 8) -> int:
+    """
+    중복 이미지 판별용 해시: 아래 hash_size * hash_size 비트는 dhash, 그 위는 color_signature
+    (util.phash_index는 칸별 색 차이가 작고 dhash 해밍 거리가 가까울 때만 같은 이미지로 봄)
+    """
+    return (color_signature(image) << (hash_size * hash_size)) | dhash(image, hash_size)
@@ -2,20 +2,88 @@ import mediapipe as mp
 from mediapipe.tasks import python
 from mediapipe.tasks.python import vision
 import numpy as np
-from PIL import Image, ImageOps
-import cv2
+from PIL import Image
 import requests
-from io import BytesIO
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import hashlib
+import os
+
+from util.image_cache import ImageCache
+from util.embedding_cache import EmbeddingCache
+from model.embedding_worker_pool import EmbeddingWorkerPool
+from model.image_preprocessing import PREPROCESS_VERSION, letterbox, open_image, decode_image, resize_pad, perceptual_hash
+from util.phash_index import PerceptualHashIndex
+from util.metrics import metrics
 
 class MediaPipeEmbeddingModel:
-    def __init__(self, model_name="embedder.tflite"):
-        base_options = python.BaseOptions(model_asset_path="./model/" + model_name)
+    def __init__(self, model_name="embedder.tflite", fetch_workers: int = None, fetch_timeout: float = None,
+                 image_cache: ImageCache = None, embedding_cache: EmbeddingCache = None, num_processes: int = None,
+                 dedup_max_distance: int = None):
+        """
+        :param model_name: ./model/ 아래의 tflite 모델 파일명
+        :param fetch_workers: 이미지 다운로드 동시 실행 수 (1 이하면 순차 다운로드)
+        :param fetch_timeout: 이미지 요청당 타임아웃(초)
+        :param image_cache: 전처리된 이미지 디스크 캐시 (없으면 IMAGE_CACHE_DIR 설정 시 자동 생성)
+        :param embedding_cache: 이미지 해시 기준 임베딩 캐시 (없으면 EMBEDDING_CACHE_PATH 설정 시 자동 생성)
+        :param num_processes: 2 이상이면 추론을 멀티 프로세스 워커 풀에서 실행 (기본값 EMBEDDING_PROCESSES)
+        :param dedup_max_distance: perceptual hash 해밍 거리가 이 값 이하인 이미지는 추론 없이 벡터 재사용
+                                   (0~3, 음수면 끔, 기본값 IMAGE_DEDUP_MAX_DISTANCE 또는 -1)
+        """
+        self.model_path = "./model/" + model_name
+        base_options = python.BaseOptions(model_asset_path=self.model_path)
         options = vision.ImageEmbedderOptions(
             base_options=base_options,
             l2_normalize=True
         )
         self.embedder = vision.ImageEmbedder.create_from_options(options)
-        self.session = requests.Session()
+
+        # 이미지 다운로드 설정값
+        self.fetch_workers = fetch_workers if fetch_workers is not None else int(os.getenv('IMAGE_FETCH_WORKERS', 8))
+        self.fetch_timeout = fetch_timeout if fetch_timeout is not None else float(os.getenv('IMAGE_FETCH_TIMEOUT', 10))
+        # 추론보다 앞서 받아둘 최대 이미지 수 (메모리 상한)
+        self.prefetch_size = int(os.getenv('IMAGE_PREFETCH_SIZE', self.fetch_workers * 4))
+
+        # requests.Session은 스레드 간 공유가 안전하지 않으므로 스레드별로 생성
+        self._local = threading.local()
+        self.session = self._get_session()
+
+        if image_cache is None and os.getenv('IMAGE_CACHE_DIR'):
+            image_cache = ImageCache()
+        self.image_cache = image_cache
+
+        if embedding_cache is None and os.getenv('EMBEDDING_CACHE_PATH'):
+            embedding_cache = EmbeddingCache()
+        self.embedding_cache = embedding_cache
+        # 같은 모델이라도 전처리 방식이 바뀌면 벡터가 달라지므로 캐시 키에 전처리 버전도 포함
+        self.model_version = f"{EmbeddingCache.model_version(self.model_path)}|{PREPROCESS_VERSION}" if embedding_cache else None
+
+        self.num_processes = num_processes if num_processes is not None else int(os.getenv('EMBEDDING_PROCESSES', 0))
+        self.worker_pool = None
+
+        # 같은 사진을 여러 상품에 올리는 경우 중복 추론 방지 (기본값 꺼짐)
+        # 비슷해 보이는 다른 상품끼리 벡터를 공유하면 되돌리기 어려우므로 카탈로그에서 검증한 뒤에만 켬
+        self.dedup_max_distance = dedup_max_distance if dedup_max_distance is not None else int(os.getenv('IMAGE_DEDUP_MAX_DISTANCE', -1))
+
+    def get_worker_pool(self) -> EmbeddingWorkerPool:
+        """멀티 프로세스 모드일 때 워커 풀을 처음 사용할 때 생성"""
+        if self.worker_pool is None and self.num_processes > 1:
+            self.worker_pool = EmbeddingWorkerPool(self.model_path, self.num_processes)
+        return self.worker_pool
+
+    def close(self):
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+            self.worker_pool = None
+
+    def _get_session(self) -> requests.Session:
+        """현재 스레드 전용 requests.Session 반환"""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
 
     def resize_with_padding(self, image: Image.Image, target_size: tuple) -> Image.Image:
         """
@@ -25,20 +93,7 @@ class MediaPipeEmbeddingModel:
         :param target_size: (width, height) 목표 크기
         :return: 리사이즈된 PIL Image 객체
         """
-        original_width, original_height = image.size
-        target_width, target_height = target_size
-
-        # 원본 이미지 비율 유지
-        scale = min(target_width / original_width, target_height / original_height)
-        new_width = int(original_width * scale)
-        new_height = int(original_height * scale)
-
-        # 이미지 Resize
-        resized_image = image.resize((new_width, new_height), Image.Resampling.LANCZOS)
-
-        # 패딩 추가
-        padded_image = ImageOps.pad(resized_image, target_size, method=Image.Resampling.LANCZOS, color=(0, 0, 0))
-        return padded_image
+        return Image.fromarray(letterbox(image, target_size))
 
     def get_image_resize(self, image_url: str, resize: tuple = (224, 224)) -> Image.Image:
         """
@@ -48,56 +103,245 @@ class MediaPipeEmbeddingModel:
         :param resize: (width, height) 리사이즈 크기
         :return: 처리된 PIL Image 객체
         """
-        response = self.session.get(image_url)
-        image = Image.open(BytesIO(response.content)).convert("RGB")
-        
-        resized_image = self.resize_with_padding(image, resize)
+        return Image.fromarray(self.load_image(image_url, resize)[0])
+
+    def load_image(self, image_url: str, resize: tuple = (224, 224)) -> tuple:
+        """
+        URL에서 이미지를 다운로드해서 한 번에 디코딩 + 리사이즈 + 패딩 (model/image_preprocessing.py)
         
-        final_buffer = BytesIO()
-        resized_image.save(final_buffer, format='JPEG')
-        return resized_image
+        :return: ((height, width, 3) uint8 RGB 배열, 원본 이미지 바이트의 sha256 digest)
+        """
+        cached = self.image_cache.get(image_url, resize, PREPROCESS_VERSION) if self.image_cache else None
+        if cached is not None and not self.image_cache.revalidate:
+            self.image_cache.record_hit()
+            metrics.incr("image_cache_hit")
+            return cached[0], cached[1].get("digest")
 
-    def get_image_embedding(self, image_url: str, resize: tuple = None) -> np.ndarray:
+        headers = {}
+        if cached is not None:
+            # 캐시된 응답의 검증자로 조건부 요청 (변경 없으면 304)
+            if cached[1].get("etag"):
+                headers["If-None-Match"] = cached[1]["etag"]
+            if cached[1].get("last_modified"):
+                headers["If-Modified-Since"] = cached[1]["last_modified"]
+
+        with metrics.timer("download"):
+            response = self._get_session().get(image_url, headers=headers, timeout=self.fetch_timeout)
+            if cached is not None and response.status_code == 304:
+                self.image_cache.record_hit()
+                metrics.incr("image_cache_hit")
+                return cached[0], cached[1].get("digest")
+            response.raise_for_status()
+        digest = hashlib.sha256(response.content).hexdigest()
+        with metrics.timer("decode"):
+            # 헤더로 크기 검사 후 축소 스케일로 실제 디코딩
+            image, size = decode_image(open_image(response.content), resize)
+
+        with metrics.timer("resize"):
+            image_array = resize_pad(image, size, resize)
+
+        if self.image_cache:
+            self.image_cache.record_miss()
+            metrics.incr("image_cache_miss")
+            self.image_cache.put(image_url, resize, image_array, {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "digest": digest,
+            }, version=PREPROCESS_VERSION)
+        return image_array, digest
+
+    def iter_images(self, product_datas: list, resize: tuple = (224, 224)):
         """
-        이미지 URL에서 임베딩을 생성하는 메서드
+        상품 이미지를 미리 다운로드/디코딩하면서 입력 순서대로 돌려주는 제너레이터
+        fetch_workers > 1이면 스레드 풀에서 최대 prefetch_size개까지 앞서 받아둠
         
-        :param image_url: 이미지 URL
+        :param product_datas: get_product_data() 결과 튜플 리스트
         :param resize: (width, height) 리사이즈 크기
-        :return: 이미지 임베딩 벡터
+        :return: (product_data, load_image() 결과 또는 발생한 Exception) 튜플을 yield
         """
-        pil_image = self.get_image_resize(image_url, resize)
+        if self.fetch_workers <= 1:
+            for product_data in product_datas:
+                try:
+                    yield product_data, self.load_image(product_data[1], resize)
+                except Exception as e:
+                    yield product_data, e
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        pending = deque()
+        try:
+            for product_data in product_datas:
+                future = executor.submit(self.load_image, product_data[1], resize)
+                pending.append((product_data, future))
+                if len(pending) >= self.prefetch_size:
+                    yield self._pop_fetched(pending)
+            while pending:
+                yield self._pop_fetched(pending)
+        finally:
+            # 중간에 제너레이터가 닫히면 아직 시작 안 한 다운로드는 취소
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+
+    def _pop_fetched(self, pending: deque) -> tuple:
+        product_data, future = pending.popleft()
+        try:
+            return product_data, future.result()
+        except Exception as e:
+            return product_data, e
+
+    def embed_image(self, image) -> np.ndarray:
+        """
+        전처리된 이미지 한 장의 임베딩을 계산하는 메서드
         
+        :param image: load_image()의 uint8 RGB 배열 또는 리사이즈된 PIL Image 객체
+        :return: 이미지 임베딩 벡터
+        """
+        # load_image() 결과 배열은 복사 없이 그대로 전달
+        data = image if isinstance(image, np.ndarray) else np.asarray(image.convert("RGB"))
         mp_image = mp.Image(
             image_format=mp.ImageFormat.SRGB, 
-            data=np.array(pil_image)
+            data=np.ascontiguousarray(data)
         )
 
-        embedding_result = self.embedder.embed(mp_image)
+        with metrics.timer("embed"):
+            embedding_result = self.embedder.embed(mp_image)
         embedding = embedding_result.embeddings[0].embedding
         return embedding
 
-    def embed_batch(self, product_datas: list, resize: tuple = (224, 224)) -> list:
+    def get_image_embedding(self, image_url: str, resize: tuple = None) -> np.ndarray:
+        """
+        이미지 URL에서 임베딩을 생성하는 메서드
+        
+        :param image_url: 이미지 URL
+        :param resize: (width, height) 리사이즈 크기
+        :return: 이미지 임베딩 벡터
+        """
+        image_array, _ = self.load_image(image_url, resize)
+        return self.embed_image(image_array)
+
+    def embed_batch(self, product_datas: list, resize: tuple = (224, 224), vector_as_list: bool = True) -> list:
         """
         여러 이미지의 임베딩을 한 번에 처리하는 메서드
+        이미지 다운로드는 iter_images()로 추론과 겹쳐서 진행하고, 결과 순서는 입력 순서를 유지
+        embedding_cache가 있으면 같은 이미지(내용 해시)는 추론 없이 캐시된 벡터 사용
+        perceptual hash가 거의 같은 이미지(이번 호출 안 또는 embedding_cache)도 추론 없이 벡터 재사용
+        멀티 프로세스 모드면 받아둔 이미지를 (워커 수 * 청크 크기)개씩 모아 워커 풀에서 추론
         
         :param product_datas: List[(product_id, image_url), ...] 형태의 튜플 리스트
         :param resize: (width, height)를 지정하면 모든 이미지를 해당 크기로 리사이즈 후 임베딩
+        :param vector_as_list: False면 image_vector를 float32 numpy 배열 그대로 반환 (메모리 절약)
         :return: Dict[product_id, embedding]
         """
+        worker_pool = self.get_worker_pool()
+        window_size = worker_pool.processes * worker_pool.chunk_size if worker_pool else 1
+
+        # 이번 호출에서 추론한 이미지의 perceptual hash -> 벡터
+        seen_phashes = PerceptualHashIndex(self.dedup_max_distance) if self.dedup_max_distance >= 0 else None
+
         embeddings = []
-        for product_id, image_url, status, primary_category_id, secondary_category_id in product_datas:
-            try:
-                
-                embedding = self.get_image_embedding(image_url,resize=resize)
-                embeddings.append({
-                    "product_id": product_id,
-                    "image_vector": embedding.tolist(),  # NumPy 배열을 리스트로 변환
-                    "status": status,
-                    "primary_category_id": primary_category_id,
-                    "secondary_category_id": secondary_category_id,
-                })
-            except Exception as e:
-                print(f"Error processing image for product {product_id}: {str(e)}")
-                continue
+        window = []
+        for product_data, loaded in self.iter_images(product_datas, resize):
+            window.append((product_data, loaded))
+            if len(window) >= window_size:
+                embeddings.extend(self._embed_window(window, resize, vector_as_list, seen_phashes))
+                window = []
+        if window:
+            embeddings.extend(self._embed_window(window, resize, vector_as_list, seen_phashes))
         
         return embeddings
+
+    def _embed_window(self, window: list, resize: tuple, vector_as_list: bool, seen_phashes: PerceptualHashIndex = None) -> list:
+        """
+        iter_images() 결과 묶음을 임베딩해서 입력 순서대로 반환 (실패한 상품은 건너뜀)
+
+        :param seen_phashes: 이전 묶음에서 추론한 이미지의 perceptual hash 조회 테이블 (None이면 중복 제거 안 함)
+        """
+        vectors = [None] * len(window)
+        cache_keys = [None] * len(window)
+        phashes = [None] * len(window)
+        pending = []  # 추론이 필요한 (window 인덱스, 이미지)
+        duplicates = {}  # 같은 묶음 안에서 먼저 나온 거의 같은 이미지의 window 인덱스
+        pending_phashes = PerceptualHashIndex(seen_phashes.max_distance) if seen_phashes is not None else None
+        phash_scope = self.embedding_cache.make_scope(self.model_version, resize) if self.embedding_cache else None
+
+        for i, (product_data, loaded) in enumerate(window):
+            if isinstance(loaded, Exception):
+                print(f"Error processing image for product {product_data[0]}: {str(loaded)}")
+                continue
+            image, digest = loaded
+            if self.embedding_cache and digest:
+                cache_keys[i] = self.embedding_cache.make_key(digest, self.model_version, resize)
+                vectors[i] = self.embedding_cache.get(cache_keys[i])
+                metrics.incr("embedding_cache_hit" if vectors[i] is not None else "embedding_cache_miss")
+                if vectors[i] is not None:
+                    metrics.incr("inferences_saved")
+                    continue
+
+            if seen_phashes is not None:
+                with metrics.timer("phash"):
+                    phashes[i] = perceptual_hash(image)
+                vectors[i] = seen_phashes.find(phashes[i])
+                if vectors[i] is None and phash_scope:
+                    vectors[i] = self.embedding_cache.find_phash(phash_scope, phashes[i], seen_phashes.max_distance)
+                source = pending_phashes.find(phashes[i]) if vectors[i] is None else None
+                if vectors[i] is not None or source is not None:
+                    if source is not None:
+                        duplicates[i] = source
+                    metrics.incr("phash_dedup_hit")
+                    metrics.incr("inferences_saved")
+                    continue
+                pending_phashes.add(phashes[i], i)
+            pending.append((i, image))
+        metrics.incr("inferences", len(pending))
+
+        if self.worker_pool is not None and pending:
+            with metrics.timer("embed_pool"):
+                results = self.worker_pool.embed_arrays([image for _, image in pending])
+            for (i, _), vector in zip(pending, results):
+                if vector.size and np.isfinite(vector).all():
+                    vectors[i] = vector
+                else:
+                    metrics.failure("embed_pool", "WorkerError")
+                    print(f"Error processing image for product {window[i][0][0]}: embedding failed in worker")
+        else:
+            for i, image in pending:
+                try:
+                    vectors[i] = self.embed_image(image)
+                except Exception as e:
+                    print(f"Error processing image for product {window[i][0][0]}: {str(e)}")
+
+        for i, source in duplicates.items():
+            vectors[i] = vectors[source]
+            if vectors[i] is None:
+                print(f"Error processing image for product {window[i][0][0]}: duplicate image failed to embed")
+
+        inferred = {i for i, _ in pending}
+        cache_items = []
+        cache_phash_items = []
+        embeddings = []
+        for i, (product_data, _) in enumerate(window):
+            embedding = vectors[i]
+            if embedding is None:
+                continue
+            if i in inferred and phashes[i] is not None:
+                seen_phashes.add(phashes[i], embedding)
+            if cache_keys[i] and (i in inferred or phashes[i] is not None):
+                # 추론했거나 perceptual hash로 찾은 벡터는 내용 해시로도 저장 (묶음 끝에서 한 번에 커밋)
+                cache_items.append((cache_keys[i], embedding))
+                if i in inferred and phashes[i] is not None:
+                    cache_phash_items.append((phash_scope, phashes[i], cache_keys[i]))
+
+            product_id, image_url, status, primary_category_id, secondary_category_id = product_data
+            embeddings.append({
+                "product_id": product_id,
+                "image_vector": embedding.tolist() if vector_as_list else embedding,  # NumPy 배열을 리스트로 변환
+                "status": status,
+                "primary_category_id": primary_category_id,
+                "secondary_category_id": secondary_category_id,
+            })
+        if cache_items:
+            self.embedding_cache.put_many(cache_items, cache_phash_items)
+        metrics.incr("products_embedded", len(embeddings))
+        metrics.incr("products_failed", len(window) - len(embeddings))
+        return embeddings
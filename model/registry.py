@@ -0,0 +1,54 @@
+import importlib
+
+# 이름 -> (모듈 경로, 클래스 이름)
+# 모듈(mediapipe, torch/transformers 등 무거운 백엔드)은 처음 get_model_class()를 부를 때만 import
+MODEL_REGISTRY = {
+    "mediapipe": ("model.mediapipe_embedding_model", "MediaPipeEmbeddingModel"),
+    "clip": ("model.clip_embedding_model", "CLIPEmbeddingModel"),
+    "blip": ("model.blip_embedding_model", "BLIPEmbeddingModel"),
+}
+
+# 이전 EMBEDDING_MODEL_FILE 값(모듈 파일 이름)도 그대로 받음
+MODEL_ALIASES = {
+    "mediapipe_embedding_model": "mediapipe",
+    "clip_embedding_model": "clip",
+    "blip_embedding_model": "blip",
+}
+
+_loaded_classes = {}
+
+def register_model(name: str, module_path: str, class_name: str):
+    """
+    임베딩 모델 등록 (import는 하지 않음)
+    :param name: 모델 이름 (get_model_class/create_model에 넘길 값)
+    :param module_path: 모델 클래스가 있는 모듈 경로 (예: model.clip_embedding_model)
+    :param class_name: 모델 클래스 이름
+    """
+    MODEL_REGISTRY[name] = (module_path, class_name)
+    _loaded_classes.pop(name, None)
+
+def available_models() -> list:
+    return sorted(MODEL_REGISTRY)
+
+def get_model_class(name: str):
+    """
+    :param name: 등록된 모델 이름 또는 별칭
+    :return: 모델 클래스 (처음 호출 시 모듈 import)
+    """
+    name = MODEL_ALIASES.get(name, name)
+    if name not in MODEL_REGISTRY:
+        raise ValueError(f"Unknown embedding model: {name} (available: {', '.join(available_models())})")
+    model_class = _loaded_classes.get(name)
+    if model_class is None:
+        module_path, class_name = MODEL_REGISTRY[name]
+        model_class = getattr(importlib.import_module(module_path), class_name)
+        _loaded_classes[name] = model_class
+    return model_class
+
+def create_model(name: str, **kwargs):
+    """
+    :param name: 등록된 모델 이름 또는 별칭
+    :param kwargs: 모델 생성자 인자 (model_name 등)
+    :return: 모델 인스턴스
+    """
+    return get_model_class(name)(**kwargs)
@@ -1,5 +1,5 @@
 from db.db_connector import DBConnector
-from model.mediapipe_embedding_model import MediaPipeEmbeddingModel
+from model.registry import create_model
 from util.similarity_calculator import SimilarityCalculator
 
 def convert_ids_to_links(similar_products: dict, product_data: list) -> dict:
@@ -78,7 +78,7 @@ def main():
     finally:
         db_connector.close()
 
-    embedding_model = MediaPipeEmbeddingModel(model_name="embedder.tflite")
+    embedding_model = create_model("mediapipe", model_name="embedder.tflite")
     image_embeddings = embedding_model.embed_batch(product_images)
     sim_calc = SimilarityCalculator()
     similarity_pairs = sim_calc.calculate_similarity(image_embeddings)
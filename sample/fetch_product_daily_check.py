@@ -0,0 +1,104 @@
+"""
+fetch_product_daily의 리스트 갱신 로직(find_products_to_reextract, merge_new_neighbors) 동작 확인.
+
+MySQL/PGVector 대신 메모리 대역으로 정해진 상황을 만들어 결과를 assert로 확인하고, 실패하면 AssertionError.
+
+사용 예:
+    python -m sample.fetch_product_daily_check
+"""
+from main.fetch_product_daily import find_products_to_reextract, merge_new_neighbors
+
+
+class FakeMySQL:
+    """DBConnector 대역: 저장된 similar_ids와 status만 흉내냄"""
+    def __init__(self, similar_ids: dict, statuses: dict):
+        self.similar_ids = similar_ids
+        self.statuses = statuses
+
+    def get_similar_ids_containing(self, product_ids) -> dict:
+        product_ids = set(product_ids)
+        return {pid: similar_list for pid, similar_list in self.similar_ids.items()
+                if self.statuses.get(pid) == 'SALE' and product_ids & set(similar_list)}
+
+    def get_statuses(self, product_ids) -> dict:
+        return {pid: self.statuses[pid] for pid in product_ids if pid in self.statuses}
+
+    def get_similar_ids(self, product_ids) -> dict:
+        return {pid: list(self.similar_ids[pid]) for pid in product_ids if pid in self.similar_ids}
+
+
+class FakePG:
+    """VectorDBConnector 대역: 상품을 1차원 위치로 두고 거리 = 위치 차이"""
+    def __init__(self, positions: dict):
+        self.positions = positions
+
+    def distance(self, a: int, b: int) -> float:
+        return abs(self.positions[a] - self.positions[b])
+
+    def get_pair_distances(self, pairs: list) -> dict:
+        return {(a, b): self.distance(a, b) for a, b in pairs if a in self.positions and b in self.positions}
+
+
+def neighbors_of(pg: FakePG, new_id: int, product_ids: list) -> list:
+    return sorted(((pid, pg.distance(new_id, pid)) for pid in product_ids), key=lambda item: item[1])
+
+
+def check_reextract():
+    # 1: 리스트 5개 중 3개 팔림, 2: 1개 팔림, 3: 팔린 상품이 없음, 4: 본인이 팔림
+    mysql_db = FakeMySQL(
+        similar_ids={1: [10, 11, 12, 13, 14], 2: [10, 20, 21], 3: [30, 31], 4: [10, 11, 12]},
+        statuses={1: 'SALE', 2: 'SALE', 3: 'SALE', 4: 'SOLD',
+                  10: 'SOLD', 11: 'SOLD', 12: 'SOLD', 13: 'SALE', 14: 'SALE',
+                  20: 'SALE', 21: 'SALE', 30: 'SALE', 31: 'SALE'})
+    assert find_products_to_reextract(mysql_db, {10, 11, 12}, threshold=3) == {1: 5}
+    # threshold는 이번에 팔린 상품뿐 아니라 리스트 안의 팔린 상품 전체로 셈
+    assert find_products_to_reextract(mysql_db, {10}, threshold=3) == {1: 5}
+    assert find_products_to_reextract(mysql_db, {10}, threshold=1) == {1: 5, 2: 3}
+    assert find_products_to_reextract(mysql_db, set(), threshold=1) == {}
+
+
+def check_merge():
+    # 기존 상품 1..25는 위치 = id, 새 상품 100/101은 위치 1.5 / 30
+    positions = {pid: float(pid) for pid in range(1, 26)}
+    positions.update({100: 1.5, 101: 30.0})
+    pg = FakePG(positions)
+    existing = list(range(5, 26))
+
+    def stored_list(pid: int, length: int) -> list:
+        return [other for other, _ in neighbors_of(pg, pid, [o for o in range(1, 26) if o != pid])][:length]
+
+    mysql_db = FakeMySQL(
+        similar_ids={
+            1: stored_list(1, 5),      # top_k(5)가 찬 리스트
+            2: stored_list(2, 3),      # top_k보다 짧은 리스트 (매크로의 20개짜리 리스트와 같은 경우)
+            3: [],                     # 빈 리스트
+            4: stored_list(4, 8),      # top_k보다 긴 리스트 (길이 유지)
+        },
+        statuses={})
+    new_neighbors = {new_id: neighbors_of(pg, new_id, [1, 2, 3, 4] + existing) for new_id in (100, 101)}
+
+    updated = merge_new_neighbors(mysql_db, pg, new_neighbors, skip_ids=set(existing), top_k=5)
+
+    # 1: 새 상품 100(거리 0.5)이 끼어들고 마지막 상품이 밀려남, 먼 101은 안 들어감
+    assert updated[1] == [100, 2, 3, 4, 5], updated[1]
+    # 2: 마지막 상품(거리 2)보다 가까운 100만 들어가고 길이가 늘어남, 101은 top_k보다 짧아도 붙이지 않음
+    assert updated[2] == [100, 1, 3, 4], updated[2]
+    # 3: 빈 리스트는 새 상품을 거리순으로 그대로 받음
+    assert updated[3] == [100, 101], updated[3]
+    # 4: top_k보다 긴 리스트는 top_k로 줄이지 않고 원래 길이 유지 (100은 거리 2.5 자리에 들어가고 마지막 9가 밀려남)
+    assert updated[4] == [3, 5, 2, 6, 100, 1, 7, 8], updated[4]
+    # skip_ids(새로 추출한 상품)는 건드리지 않음
+    assert not set(updated) & set(existing)
+
+    # 끼어들 새 상품이 없으면 갱신 없음
+    far_neighbors = {101: neighbors_of(pg, 101, [1, 2, 4])}
+    assert merge_new_neighbors(mysql_db, pg, far_neighbors, skip_ids=set(), top_k=5) == {}
+
+
+def main():
+    check_reextract()
+    check_merge()
+    print("fetch_product_daily checks passed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+halfvec(float16) 저장 시 top-k 유사 상품 recall 비교.
+
+pgvector는 halfvec 값을 float32로 올려서 거리를 계산하므로, 벡터를 float16으로 반올림한 뒤
+float32로 구한 top-k와 원래 float32 top-k가 얼마나 겹치는지 보면 됨.
+
+사용 예:
+    python -m sample.halfvec_recall --primary 1 --secondary 2   # PGVector의 한 카테고리 파티션
+    python -m sample.halfvec_recall --random 20000              # 랜덤 정규화 벡터
+"""
+import argparse
+import numpy as np
+
+def top_k_ids(vectors: np.ndarray, top_k: int, block_rows: int = 1024) -> np.ndarray:
+    """
+    각 벡터의 내적 기준 top_k 이웃 인덱스 (자기 자신 제외, 순서 무관)
+    """
+    n = len(vectors)
+    k = min(top_k, n - 1)
+    result = np.empty((n, k), dtype=np.int64)
+    for start in range(0, n, block_rows):
+        end = min(start + block_rows, n)
+        scores = vectors[start:end] @ vectors.T
+        scores[np.arange(end - start), np.arange(start, end)] = -np.inf
+        result[start:end] = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return result
+
+def recall(expected: np.ndarray, actual: np.ndarray) -> float:
+    hits = sum(len(np.intersect1d(e, a, assume_unique=True)) for e, a in zip(expected, actual))
+    return hits / expected.size
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--primary', type=int, default=None, help='primary_category_id of the partition to load')
+    parser.add_argument('--secondary', type=int, default=None, help='secondary_category_id of the partition to load')
+    parser.add_argument('--random', type=int, default=5000, help='Number of random vectors when no partition is given')
+    parser.add_argument('--dimension', type=int, default=1024)
+    parser.add_argument('--top-k', type=int, default=100)
+    args = parser.parse_args()
+
+    if args.primary is not None and args.secondary is not None:
+        from db.vector_db_connector import VectorDBConnector
+        pg_db = VectorDBConnector()
+        try:
+            _, vectors = pg_db.fetch_partition_vectors(args.primary, args.secondary)
+        finally:
+            pg_db.close()
+    else:
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((args.random, args.dimension)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    if len(vectors) < 2:
+        print("Not enough vectors")
+        return
+
+    half_vectors = vectors.astype(np.float16).astype(np.float32)
+    expected = top_k_ids(vectors, args.top_k)
+    actual = top_k_ids(half_vectors, args.top_k)
+
+    dimension = vectors.shape[1]
+    print(f"vectors: {len(vectors)}, dimension: {dimension}, top_k: {expected.shape[1]}")
+    print(f"recall@k (halfvec vs vector): {recall(expected, actual):.4f}")
+    print(f"max abs error: {np.abs(vectors - half_vectors).max():.2e}")
+    # pgvector 저장 크기: varlena 헤더 4바이트 + 차원 수/예약 4바이트 + 원소
+    print(f"bytes per vector: vector {8 + 4 * dimension}, halfvec {8 + 2 * dimension}")
+
+if __name__ == "__main__":
+    main()
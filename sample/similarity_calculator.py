@@ -1,50 +1,67 @@
 import numpy as np
-from scipy.spatial.distance import cosine
 
 class SimilarityCalculator:
     """
-    embeddings dict를 넣어주면 모든 pairwise cosine 거리를 구하고,
-    이를 1 - distance(= similarity)로 변환한 뒤 
-    각 product별 유사상품 리스트를 정렬해서 반환하는 클래스.
+    embeddings dict를 넣어주면 cosine 거리(1 - similarity)를 기준으로
+    각 product별 가장 유사한 상품 / 가장 다른 상품 리스트를 정렬해서 반환하는 클래스.
+    전체 n² 쌍을 만들지 않고, 정규화된 행렬을 블록 단위로 곱해서 부분 선택(argpartition)만 함.
     """
+    def __init__(self, block_elements: int = 16 * 1024 * 1024):
+        """
+        :param block_elements: 한 번에 계산하는 유사도 행렬 블록의 최대 원소 수 (메모리 상한)
+        """
+        self.block_elements = block_elements
 
-    def calculate_similarity(self, embeddings: dict) -> dict:
+    def calculate_similarity(self, embeddings: dict, top_k: int = 100) -> dict:
         """
         :param embeddings: { product_id: np.array([...]) }
+        :param top_k: 상품별로 남길 가장 유사한 / 가장 다른 상품 수
         :return: { 
                     product_id: [ (other_product_id, distance), ..., ],
                     ...}
-        낮은 distance 값이 더 유사한 상품을 의미
+        낮은 distance 값이 더 유사한 상품을 의미.
+        각 리스트는 distance 오름차순이며 앞쪽 top_k개(가장 유사)와 뒤쪽 top_k개(가장 다름)만 포함
+        (다른 상품 수가 2 * top_k 이하이면 전체)
         """
-        result = {}
         product_ids = list(embeddings.keys())
         n = len(product_ids)
+        if n < 2:
+            return {pid: [] for pid in product_ids}
 
-        for i in range(n):
-            pid_i = product_ids[i]
-            emb_i = embeddings[pid_i]
-            distances = []
+        # 한 번만 정규화 (norm이 0인 벡터는 모든 상품과 distance 1)
+        matrix = np.vstack([np.asarray(embeddings[pid], dtype=np.float32).ravel() for pid in product_ids])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
 
-            for j in range(i + 1, n):
-                pid_j = product_ids[j]
-                emb_j = embeddings[pid_j]
+        k = min(top_k, n - 1)
+        keep_all = n - 1 <= 2 * k
+        block_rows = max(1, self.block_elements // n)
 
-                # cosine distance 직접 사용 (1 - similarity 연산 제거)
-                distance = cosine(emb_i, emb_j)
-                
-                distances.append((pid_j, distance))
-                
-                if pid_j not in result:
-                    result[pid_j] = []
-                result[pid_j].append((pid_i, distance))
+        result = {}
+        for start in range(0, n, block_rows):
+            end = min(start + block_rows, n)
+            rows = np.arange(end - start)
+            distances = 1.0 - matrix[start:end] @ matrix.T
 
-            # distance가 작은 순으로 정렬 (가장 유사한 것이 앞으로)
-            distances.sort(key=lambda x: x[1])
-            result[pid_i] = distances
+            if keep_all:
+                # 자기 자신은 맨 뒤로 보낸 뒤 잘라냄
+                distances[rows, rows + start] = np.inf
+                order = np.argsort(distances, axis=1, kind="stable")[:, :n - 1]
+            else:
+                # 가장 유사한 k개: 자기 자신을 +inf로, 가장 다른 k개: 자기 자신을 -inf로 두고 부분 선택
+                distances[rows, rows + start] = np.inf
+                nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+                distances[rows, rows + start] = -np.inf
+                farthest = np.argpartition(distances, -k, axis=1)[:, -k:]
+                distances[rows, rows + start] = np.inf
+                candidates = np.concatenate([nearest, farthest], axis=1)
+                candidate_distances = np.take_along_axis(distances, candidates, axis=1)
+                order = np.take_along_axis(candidates, np.argsort(candidate_distances, axis=1, kind="stable"), axis=1)
 
-        # 각 product_id에 대해 distance 기준 정렬
-        for pid in result:
-            result[pid].sort(key=lambda x: x[1])
+            for row in range(end - start):
+                result[product_ids[start + row]] = [
+                    (product_ids[j], float(distances[row, j])) for j in order[row]
+                ]
 
         return result
 
@@ -52,7 +69,7 @@ class SimilarityCalculator:
         """
         각 상품별로 가장 유사한 상품 top_k개와 가장 다른 상품 top_k개의 id 리스트를 반환
         
-        :param similarities: calculate_similarity()의 결과
+        :param similarities: calculate_similarity()의 결과 (같은 top_k 이상으로 계산한 것)
         :param top_k: 반환할 상품 개수
         :return: (similar_products, dissimilar_products)
                 각각 { product_id: [similar_product_ids], ... }
@@ -3,6 +3,7 @@ import numpy as np
 from typing import List, Tuple, Set
 from scipy.spatial.distance import cosine
 import json
+from model.registry import get_model_class
 
 class TestEmbedding:
     def __init__(self, model_name: str, data_dir: str, model_class: object, folders: List[str]):
@@ -118,18 +119,8 @@ def main():
     model_name = os.getenv('MODEL_NAME', 'openai/clip-vit-base-patch32')
     data_dir = os.getenv('DATA_DIR', './data')
     
-    # Import the specified embedding model
-    if embedding_model_file == 'blip_embedding_model':
-        from model.blip_embedding_model import BLIPEmbeddingModel
-        model_class = BLIPEmbeddingModel
-    elif embedding_model_file == 'clip_embedding_model':
-        from model.clip_embedding_model import CLIPEmbeddingModel
-        model_class = CLIPEmbeddingModel
-    elif embedding_model_file == 'mediapipe_embedding_model':
-        from model.mediapipe_embedding_model import MediaPipeEmbeddingModel
-        model_class = MediaPipeEmbeddingModel
-    else:
-        raise ValueError(f"Unknown embedding model file: {embedding_model_file}")
+    # Resolve the embedding model by name (only the selected backend is imported)
+    model_class = get_model_class(embedding_model_file)
 
     # Define similar and different pairs from environment variables
     similar_pairs = eval(os.getenv('SIMILAR_PAIRS', '[]'))
@@ -0,0 +1,120 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+def add_checkpoint_arguments(parser):
+    """main/ 스크립트 공통 --resume / --run-id 옵션"""
+    parser.add_argument('--resume', action='store_true',
+                        help='Resume the latest unfinished run with the same arguments, skipping finished chunks')
+    parser.add_argument('--run-id', type=str, default=None, help='Run id to record checkpoints under (or to resume)')
+
+class CheckpointStore:
+    """
+    긴 임베딩/추출 작업의 청크별 진행 상황을 기록하는 로컬 SQLite 저장소.
+    청크가 끝날 때마다 (run_id, 단계, 청크 키, 상품 id 범위)를 커밋하므로
+    작업이 중간에 죽어도 --resume 으로 끝난 청크를 건너뛰고 이어서 실행 가능.
+
+    - job_run: 실행 단위 (job 이름 + 인자로 같은 실행인지 판단)
+    - job_checkpoint: 끝난 청크 (단계: upserted, extracted:<조건> 등)
+    """
+    def __init__(self, db_path: str = None):
+        """
+        :param db_path: SQLite 파일 경로 (기본값 CHECKPOINT_PATH)
+        """
+        self.db_path = db_path or os.getenv('CHECKPOINT_PATH', './state/checkpoints.sqlite3')
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_run (
+                run_id      TEXT PRIMARY KEY,
+                job         TEXT NOT NULL,
+                params      TEXT NOT NULL,
+                started_at  TEXT NOT NULL,
+                finished_at TEXT
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_checkpoint (
+                run_id      TEXT NOT NULL,
+                stage       TEXT NOT NULL,
+                chunk_key   TEXT NOT NULL,
+                first_id    INTEGER,
+                last_id     INTEGER,
+                items       INTEGER,
+                finished_at TEXT NOT NULL,
+                PRIMARY KEY (run_id, stage, chunk_key)
+            )
+        """)
+        self._conn.commit()
+
+    def start_run(self, job: str, params: dict = None, run_id: str = None, resume: bool = False) -> str:
+        """
+        :param job: 작업 이름 (스크립트 이름 등)
+        :param params: 실행 인자 (resume 시 같은 인자의 실행만 이어받음)
+        :param run_id: 지정하면 그 run_id로 기록 (이미 있으면 이어서)
+        :param resume: True면 같은 job/params의 가장 최근 미완료 실행을 이어받음 (없으면 새로 시작)
+        :return: run_id
+        """
+        params_json = json.dumps(params or {}, sort_keys=True, ensure_ascii=False)
+        now = datetime.now()
+        with self._lock:
+            if run_id is None and resume:
+                row = self._conn.execute("""
+                    SELECT run_id FROM job_run
+                    WHERE job = ? AND params = ? AND finished_at IS NULL
+                    ORDER BY started_at DESC
+                    LIMIT 1
+                """, (job, params_json)).fetchone()
+                if row is not None:
+                    run_id = row[0]
+            if run_id is None:
+                run_id = f"{job}-{now.strftime('%Y%m%d-%H%M%S-%f')}"
+            self._conn.execute(
+                "INSERT OR IGNORE INTO job_run (run_id, job, params, started_at) VALUES (?, ?, ?, ?)",
+                (run_id, job, params_json, now.isoformat())
+            )
+            self._conn.commit()
+        return run_id
+
+    def finish_run(self, run_id: str):
+        with self._lock:
+            self._conn.execute("UPDATE job_run SET finished_at = ? WHERE run_id = ?", (datetime.now().isoformat(), run_id))
+            self._conn.commit()
+
+    def mark_done(self, run_id: str, stage: str, first_id: int, last_id: int, items: int, chunk_key: str = None):
+        """청크 하나가 끝났음을 기록 (chunk_key 기본값은 'first_id-last_id')"""
+        chunk_key = chunk_key or f"{first_id}-{last_id}"
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO job_checkpoint (run_id, stage, chunk_key, first_id, last_id, items, finished_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (run_id, stage, chunk_key, first_id, last_id, items, datetime.now().isoformat()))
+            self._conn.commit()
+
+    def done_keys(self, run_id: str, stage: str) -> set:
+        """:return: 끝난 청크 키 집합"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_key FROM job_checkpoint WHERE run_id = ? AND stage = ?", (run_id, stage)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def last_done_id(self, run_id: str, stage: str) -> int:
+        """
+        id 순서대로 처리하는 단계에서 끝난 청크의 가장 큰 last_id (없으면 0)
+        keyset 페이지네이션의 start_after_id로 그대로 사용
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(last_id) FROM job_checkpoint WHERE run_id = ? AND stage = ?", (run_id, stage)
+            ).fetchone()
+        return row[0] or 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
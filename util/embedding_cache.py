@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from util.phash_index import phash_bands, phash_distance, MAX_PHASH_DISTANCE
+
+class EmbeddingCache:
+    """
+    (이미지 내용 해시, 모델 버전, 리사이즈 크기) -> 임베딩 벡터를 저장하는 로컬 SQLite 캐시.
+    같은 사진이 다시 들어오면 추론 없이 저장된 벡터를 그대로 사용.
+    phash_index 테이블에 perceptual hash 밴드를 같이 저장해서, 재압축/리사이즈된 거의 같은 사진도 찾을 수 있음.
+    WAL 모드라 daily/macro 등 여러 작업이 동시에 같은 파일을 써도 됨.
+    """
+    def __init__(self, db_path: str = None):
+        """
+        :param db_path: SQLite 파일 경로 (기본값 EMBEDDING_CACHE_PATH)
+        """
+        self.db_path = db_path or os.getenv('EMBEDDING_CACHE_PATH', './cache/embeddings.sqlite3')
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embedding_cache (
+                cache_key   TEXT PRIMARY KEY,
+                vector      BLOB NOT NULL
+            )
+        """)
+        # scope: 모델 버전 + 리사이즈 크기 (다른 모델의 벡터를 재사용하지 않도록)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS phash_index (
+                scope       TEXT NOT NULL,
+                band        INTEGER NOT NULL,
+                band_value  INTEGER NOT NULL,
+                phash       TEXT NOT NULL,
+                cache_key   TEXT NOT NULL,
+                PRIMARY KEY (scope, band, band_value, phash)
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def model_version(model_path: str) -> str:
+        """모델 파일명 + 파일 내용 해시 (같은 이름으로 모델을 교체해도 캐시가 섞이지 않도록)"""
+        sha = hashlib.sha256()
+        with open(model_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha.update(block)
+        return f"{os.path.basename(model_path)}:{sha.hexdigest()[:16]}"
+
+    def make_key(self, image_digest: str, model_version: str, resize: tuple) -> str:
+        return f"{image_digest}|{model_version}|{resize[0]}x{resize[1]}"
+
+    def get(self, cache_key: str):
+        """:return: float32 벡터 또는 캐시에 없으면 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embedding_cache WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put(self, cache_key: str, vector: np.ndarray):
+        self.put_many([(cache_key, vector)])
+
+    def put_many(self, items: list, phash_items: list = None):
+        """
+        벡터와 perceptual hash 등록을 한 트랜잭션(커밋 한 번)으로 저장
+        WAL 모드여도 커밋마다 sync가 일어나므로 묶음 단위로 모아서 호출
+
+        :param items: [(cache_key, 벡터), ...]
+        :param phash_items: [(scope, phash, cache_key), ...] (put_phash()와 같은 등록)
+        """
+        rows = [(cache_key, np.ascontiguousarray(vector, dtype=np.float32).tobytes()) for cache_key, vector in items]
+        phash_rows = [(scope, band, band_value, f"{phash:016x}", cache_key)
+                      for scope, phash, cache_key in phash_items or []
+                      for band, band_value in phash_bands(phash)]
+        if not rows and not phash_rows:
+            return
+        with self._lock:
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache (cache_key, vector) VALUES (?, ?)", rows
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO phash_index (scope, band, band_value, phash, cache_key) VALUES (?, ?, ?, ?, ?)",
+                    phash_rows
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+    def make_scope(self, model_version: str, resize: tuple) -> str:
+        # phash2: 색 요약이 들어간 perceptual hash (흑백 dhash만 저장한 이전 항목은 쓰지 않음)
+        return f"{model_version}|{resize[0]}x{resize[1]}|phash2"
+
+    def put_phash(self, scope: str, phash: int, cache_key: str):
+        """cache_key로 저장된 벡터를 perceptual hash로도 찾을 수 있게 등록"""
+        self.put_many([], [(scope, phash, cache_key)])
+
+    def find_phash(self, scope: str, phash: int, max_distance: int = 2):
+        """
+        해밍 거리 max_distance 이하인 perceptual hash 중 가장 가까운 이미지의 벡터
+
+        :return: float32 벡터 또는 없으면 None
+        """
+        max_distance = min(max_distance, MAX_PHASH_DISTANCE)
+        conditions = " OR ".join(["(p.band = ? AND p.band_value = ?)"] * len(phash_bands(phash)))
+        params = [scope] + [value for band_key in phash_bands(phash) for value in band_key]
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT p.phash, c.vector
+                FROM phash_index p
+                JOIN embedding_cache c ON c.cache_key = p.cache_key
+                WHERE p.scope = ? AND ({conditions})
+            """, params).fetchall()
+
+        best_distance = max_distance + 1
+        best_vector = None
+        for phash_hex, vector in rows:
+            distance = phash_distance(phash, int(phash_hex, 16))
+            if distance < best_distance:
+                best_distance = distance
+                best_vector = vector
+        if best_vector is None:
+            return None
+        return np.frombuffer(best_vector, dtype=np.float32)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,129 @@
+import os
+import queue
+import threading
+
+from util.metrics import metrics
+
+# 스테이지 종료 표시
+_DONE = object()
+
+class EmbeddingPipeline:
+    """
+    MySQL 청크 읽기 -> 이미지 다운로드/임베딩 -> PGVector upsert 를 스레드 단계로 나눠 겹쳐서 실행하는 파이프라인.
+    단계 사이는 크기가 제한된 Queue로 연결되어 있어 느린 단계가 앞 단계를 멈추게 하고(backpressure),
+    메모리에는 최대 (queue_size * 2 + 3)개 청크만 올라감. upsert는 청크마다 커밋.
+    checkpoint가 있으면 upsert가 끝난 청크의 id 범위를 기록하고, 다음 실행은 마지막으로 끝난 id 다음부터 읽음
+    (청크는 id 순서대로 하나의 write 스레드에서 처리되므로 끝난 청크는 항상 앞쪽 구간).
+    """
+    def __init__(self, mysql_db, model, vector_db, chunk_size: int = None, queue_size: int = None,
+                 resize: tuple = (224, 224), checkpoint=None, run_id: str = None):
+        """
+        :param mysql_db: DBConnector
+        :param model: embed_batch()를 가진 임베딩 모델
+        :param vector_db: VectorDBConnector
+        :param chunk_size: 청크당 상품 수 (기본값 PIPELINE_CHUNK_SIZE)
+        :param queue_size: 단계 사이 Queue에 쌓아둘 최대 청크 수 (기본값 PIPELINE_QUEUE_SIZE)
+        :param resize: 임베딩 전 리사이즈 크기
+        :param checkpoint: CheckpointStore (없으면 기록하지 않음)
+        :param run_id: checkpoint에 기록할 실행 id
+        """
+        self.mysql_db = mysql_db
+        self.model = model
+        self.vector_db = vector_db
+        self.chunk_size = chunk_size or int(os.getenv('PIPELINE_CHUNK_SIZE', 500))
+        self.queue_size = queue_size or int(os.getenv('PIPELINE_QUEUE_SIZE', 2))
+        self.resize = resize
+        self.checkpoint = checkpoint
+        self.run_id = run_id
+
+        self._stop = threading.Event()
+        self._errors = []
+        self.stats = {"read": 0, "embedded": 0, "upserted": 0, "chunks": 0, "resumed_after_id": 0}
+
+    def run(self, where_condition: str, start_after_id: int = 0) -> dict:
+        """
+        :param where_condition: 임베딩할 상품 WHERE 조건
+        :param start_after_id: 이 id보다 큰 상품부터 처리 (checkpoint가 있으면 기록된 진행 위치와 비교해서 큰 값)
+        :return: 단계별 처리 건수
+        """
+        if self.checkpoint is not None:
+            start_after_id = max(start_after_id, self.checkpoint.last_done_id(self.run_id, "upserted"))
+        self.stats["resumed_after_id"] = start_after_id
+
+        read_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+
+        threads = [
+            threading.Thread(target=self._guard, args=(self._read_stage, where_condition, start_after_id, read_queue), name="pipeline-read"),
+            threading.Thread(target=self._guard, args=(self._embed_stage, read_queue, write_queue), name="pipeline-embed"),
+            threading.Thread(target=self._guard, args=(self._write_stage, write_queue), name="pipeline-write"),
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if self._errors:
+            raise self._errors[0]
+        return self.stats
+
+    def _guard(self, stage, *args):
+        """한 단계에서 예외가 나면 나머지 단계도 멈추도록 표시"""
+        try:
+            stage(*args)
+        except Exception as e:
+            self._errors.append(e)
+            self._stop.set()
+
+    def _put(self, target: queue.Queue, item) -> bool:
+        """Queue가 가득 차 있으면 기다리되, 다른 단계가 실패하면 포기"""
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: queue.Queue):
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _read_stage(self, where_condition: str, start_after_id: int, read_queue: queue.Queue):
+        try:
+            for chunk in self.mysql_db.iter_product_data_chunks(where_condition, self.chunk_size, start_after_id):
+                self.stats["read"] += len(chunk)
+                if not self._put(read_queue, chunk):
+                    return
+        finally:
+            self._put(read_queue, _DONE)
+
+    def _embed_stage(self, read_queue: queue.Queue, write_queue: queue.Queue):
+        try:
+            while True:
+                chunk = self._get(read_queue)
+                if chunk is _DONE:
+                    return
+                embeddings = self.model.embed_batch(chunk, self.resize, vector_as_list=False)
+                self.stats["embedded"] += len(embeddings)
+                # 실패한 상품이 있어도 청크의 id 범위 그대로 checkpoint에 기록
+                if not self._put(write_queue, (chunk[0][0], chunk[-1][0], len(chunk), embeddings)):
+                    return
+        finally:
+            self._put(write_queue, _DONE)
+
+    def _write_stage(self, write_queue: queue.Queue):
+        while True:
+            item = self._get(write_queue)
+            if item is _DONE:
+                return
+            first_id, last_id, chunk_length, embeddings = item
+            self.stats["upserted"] += self.vector_db.upsert_embeddings_bulk(embeddings)
+            self.stats["chunks"] += 1
+            if self.checkpoint is not None:
+                self.checkpoint.mark_done(self.run_id, "upserted", first_id, last_id, chunk_length)
+            metrics.log_summary(batch=self.stats["chunks"], upserted=len(embeddings))
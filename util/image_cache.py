@@ -0,0 +1,144 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+class ImageCache:
+    """
+    URL 기준으로 전처리(리사이즈+패딩)가 끝난 이미지 배열을 디스크에 저장하는 캐시.
+    전체 용량이 max_bytes를 넘으면 가장 오래 사용하지 않은 항목부터 삭제(LRU).
+
+    파일 구성: <cache_dir>/<key[:2]>/<key>.npy (uint8 HxWx3) + <key>.json (ETag/Last-Modified 등)
+    """
+    def __init__(self, cache_dir: str = None, max_bytes: int = None, revalidate: bool = None):
+        """
+        :param cache_dir: 캐시 디렉토리 (기본값 IMAGE_CACHE_DIR)
+        :param max_bytes: 캐시 최대 용량(byte) (기본값 IMAGE_CACHE_MAX_MB, 2GB)
+        :param revalidate: True면 캐시 hit이어도 ETag/Last-Modified로 조건부 요청해서 변경 여부 확인
+        """
+        self.cache_dir = cache_dir or os.getenv('IMAGE_CACHE_DIR', './cache/images')
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.getenv('IMAGE_CACHE_MAX_MB', 2048)) * 1024 * 1024
+        if revalidate is None:
+            revalidate = os.getenv('IMAGE_CACHE_REVALIDATE', 'false').lower() == 'true'
+        self.revalidate = revalidate
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # key -> 파일 크기, 앞쪽일수록 오래 전에 사용된 항목
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_entries()
+
+    def _load_entries(self):
+        """기존 캐시 파일을 마지막 사용 시각 순으로 읽어 LRU 순서 복원"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                if not file_name.endswith(".npy"):
+                    continue
+                path = os.path.join(root, file_name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, file_name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._total_bytes += size
+
+    def make_key(self, image_url: str, resize: tuple, version: str = None) -> str:
+        """
+        :param version: 전처리 방식 버전 (방식이 바뀌면 이전 결과를 다른 키로 취급)
+        """
+        key = f"{image_url}|{resize[0]}x{resize[1]}"
+        if version:
+            key += f"|{version}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple:
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + ".npy", base + ".json"
+
+    def get(self, image_url: str, resize: tuple, version: str = None):
+        """
+        :return: (이미지 배열, 메타데이터 dict) 또는 캐시에 없으면 None
+        hit/miss 카운트는 호출 측에서 record_hit/record_miss로 기록 (조건부 요청 결과에 따라 달라지므로)
+        """
+        key = self.make_key(image_url, resize, version)
+        array_path, meta_path = self._paths(key)
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            array = np.load(array_path)
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            # 파일 mtime을 마지막 사용 시각으로 사용
+            os.utime(array_path)
+        except (OSError, ValueError):
+            # 다른 프로세스가 지웠거나 깨진 파일이면 miss로 처리
+            self._discard(key)
+            return None
+        return array, meta
+
+    def put(self, image_url: str, resize: tuple, array: np.ndarray, meta: dict = None, version: str = None):
+        key = self.make_key(image_url, resize, version)
+        array_path, meta_path = self._paths(key)
+        os.makedirs(os.path.dirname(array_path), exist_ok=True)
+
+        # 쓰는 도중 죽어도 반쯤 쓴 파일이 남지 않도록 임시 파일에 쓰고 rename
+        tmp_suffix = f".{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(meta_path + tmp_suffix, "w") as f:
+            json.dump(meta or {}, f)
+        with open(array_path + tmp_suffix, "wb") as f:
+            np.save(f, np.ascontiguousarray(array, dtype=np.uint8))
+        os.replace(meta_path + tmp_suffix, meta_path)
+        os.replace(array_path + tmp_suffix, array_path)
+
+        size = os.path.getsize(array_path)
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            evict_keys = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evict_keys.append(old_key)
+            self.evictions += len(evict_keys)
+        for old_key in evict_keys:
+            self._remove_files(old_key)
+
+    def _discard(self, key: str):
+        with self._lock:
+            self._total_bytes -= self._entries.pop(key, 0)
+        self._remove_files(key)
+
+    def _remove_files(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+            }
@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import threading
+from contextlib import nullcontext
+
+# 비활성화 상태에서 timer()가 돌려주는 공용 no-op 컨텍스트
+_NULL_TIMER = nullcontext()
+
+class _StageTimer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        if exc_type is not None:
+            self.metrics.failure(self.stage, exc_type.__name__)
+        return False
+
+class Metrics:
+    """
+    단계별 소요 시간/카운터/실패 원인 집계.
+    METRICS_ENABLED=true 일 때만 기록하고, 꺼져 있으면 timer()/incr()가 아무 일도 하지 않음.
+
+    - log_summary(): 직전 요약 이후 구간 + 누적 값을 JSON 한 줄로 출력
+    - write_prometheus(): node_exporter textfile collector 형식으로 파일 저장
+    """
+    def __init__(self, enabled: bool = None, job: str = None):
+        if enabled is None:
+            enabled = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+        self.enabled = enabled
+        self.job = job or os.getenv('METRICS_JOB', 'embedding')
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # stage -> [호출 수, 누적 초, 최대 초]
+            self._stages = {}
+            self._batch_stages = {}
+            self._counters = {}
+            self._batch_counters = {}
+            # (stage, cause) -> 횟수
+            self._failures = {}
+
+    def timer(self, stage: str):
+        """with metrics.timer("download"): ... 형태로 사용"""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _StageTimer(self, stage)
+
+    def observe(self, stage: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            for stages in (self._stages, self._batch_stages):
+                stat = stages.get(stage)
+                if stat is None:
+                    stages[stage] = [1, seconds, seconds]
+                else:
+                    stat[0] += 1
+                    stat[1] += seconds
+                    if seconds > stat[2]:
+                        stat[2] = seconds
+
+    def incr(self, name: str, value: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+            self._batch_counters[name] = self._batch_counters.get(name, 0) + value
+
+    def failure(self, stage: str, cause: str):
+        if not self.enabled:
+            return
+        with self._lock:
+            key = (stage, cause)
+            self._failures[key] = self._failures.get(key, 0) + 1
+
+    @staticmethod
+    def _stage_summary(stages: dict) -> dict:
+        return {
+            stage: {"count": count, "seconds": round(total, 6), "avg_ms": round(total / count * 1000, 3), "max_ms": round(peak * 1000, 3)}
+            for stage, (count, total, peak) in stages.items()
+        }
+
+    def log_summary(self, batch=None, **extra) -> dict:
+        """
+        직전 요약 이후(batch) 값과 누적(total) 값을 구조화된 로그 한 줄로 출력
+
+        :param batch: 배치 이름/번호
+        :return: 출력한 dict (비활성화면 None)
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            summary = {
+                "job": self.job,
+                "batch": batch,
+                "batch_stages": self._stage_summary(self._batch_stages),
+                "batch_counters": dict(self._batch_counters),
+                "total_stages": self._stage_summary(self._stages),
+                "total_counters": dict(self._counters),
+                "failures": [{"stage": stage, "cause": cause, "count": count}
+                             for (stage, cause), count in self._failures.items()],
+            }
+            self._batch_stages = {}
+            self._batch_counters = {}
+        summary.update(extra)
+        print("METRICS " + json.dumps(summary, ensure_ascii=False, default=str))
+        return summary
+
+    def write_prometheus(self, path: str = None):
+        """
+        Prometheus textfile 형식으로 누적 값 저장 (기본 경로 METRICS_PROM_FILE, 없으면 저장 안 함)
+        """
+        path = path or os.getenv('METRICS_PROM_FILE')
+        if not self.enabled or not path:
+            return
+        job = self.job.replace('"', '')
+        with self._lock:
+            lines = [
+                "# TYPE embedding_stage_calls_total counter",
+                *(f'embedding_stage_calls_total{{job="{job}",stage="{stage}"}} {count}'
+                  for stage, (count, _, _) in self._stages.items()),
+                "# TYPE embedding_stage_seconds_total counter",
+                *(f'embedding_stage_seconds_total{{job="{job}",stage="{stage}"}} {total:.6f}'
+                  for stage, (_, total, _) in self._stages.items()),
+                "# TYPE embedding_stage_max_seconds gauge",
+                *(f'embedding_stage_max_seconds{{job="{job}",stage="{stage}"}} {peak:.6f}'
+                  for stage, (_, _, peak) in self._stages.items()),
+                "# TYPE embedding_events_total counter",
+                *(f'embedding_events_total{{job="{job}",name="{name}"}} {value}'
+                  for name, value in self._counters.items()),
+                "# TYPE embedding_failures_total counter",
+                *(f'embedding_failures_total{{job="{job}",stage="{stage}",cause="{cause}"}} {count}'
+                  for (stage, cause), count in self._failures.items()),
+                "# TYPE embedding_last_write_timestamp_seconds gauge",
+                f'embedding_last_write_timestamp_seconds{{job="{job}"}} {time.time():.0f}',
+            ]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+# 프로세스 전체에서 공유하는 기본 인스턴스
+metrics = Metrics()
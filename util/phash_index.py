@@ -0,0 +1,72 @@
+import os
+import numpy as np
+
+# perceptual hash의 아래 64비트(dhash)를 16비트씩 4개 밴드로 나눔
+# 해밍 거리가 3 이하인 두 해시는 적어도 한 밴드가 완전히 같으므로 (비둘기집 원리) 밴드 값으로 후보만 찾으면 됨
+# 64비트 위쪽은 칸별 RGB 평균(color_signature)이라 모든 값의 차이가 PHASH_MAX_COLOR_DIFF 이하여야 같은 이미지로 봄
+PHASH_BANDS = 4
+PHASH_BAND_BITS = 16
+PHASH_BITS = PHASH_BANDS * PHASH_BAND_BITS
+MAX_PHASH_DISTANCE = PHASH_BANDS - 1
+PHASH_MAX_COLOR_DIFF = int(os.getenv('IMAGE_DEDUP_MAX_COLOR_DIFF', 3))
+
+def phash_bands(phash: int) -> list:
+    """:return: [(밴드 번호, 밴드 값), ...]"""
+    mask = (1 << PHASH_BAND_BITS) - 1
+    return [(band, (phash >> (band * PHASH_BAND_BITS)) & mask) for band in range(PHASH_BANDS)]
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+def color_difference(a: int, b: int) -> int:
+    """두 perceptual hash의 색 요약에서 칸/채널별 차이의 최댓값 (0~255)"""
+    color_a, color_b = a >> PHASH_BITS, b >> PHASH_BITS
+    if color_a == color_b:
+        return 0
+    length = max(color_a.bit_length(), color_b.bit_length(), 1) // 8 + 1
+    values_a = np.frombuffer(color_a.to_bytes(length, "big"), dtype=np.uint8).astype(np.int16)
+    values_b = np.frombuffer(color_b.to_bytes(length, "big"), dtype=np.uint8).astype(np.int16)
+    return int(np.abs(values_a - values_b).max())
+
+def phash_distance(a: int, b: int) -> int:
+    """dhash 부분의 해밍 거리 (색 요약 차이가 PHASH_MAX_COLOR_DIFF보다 크면 어떤 max_distance보다도 큰 값)"""
+    distance = hamming_distance(a & ((1 << PHASH_BITS) - 1), b & ((1 << PHASH_BITS) - 1))
+    if distance <= MAX_PHASH_DISTANCE and color_difference(a, b) > PHASH_MAX_COLOR_DIFF:
+        return PHASH_BITS + 1
+    return distance
+
+class PerceptualHashIndex:
+    """
+    perceptual hash -> 값(벡터, 인덱스 등) 인메모리 조회 테이블.
+    해밍 거리 max_distance 이하인 해시 중 가장 가까운 것의 값을 돌려줌
+    """
+    def __init__(self, max_distance: int = 2):
+        """
+        :param max_distance: 같은 이미지로 볼 최대 해밍 거리 (0이면 완전히 같은 해시만, 최대 3)
+        """
+        if not 0 <= max_distance <= MAX_PHASH_DISTANCE:
+            raise ValueError(f"max_distance must be between 0 and {MAX_PHASH_DISTANCE}, got {max_distance}")
+        self.max_distance = max_distance
+        # (밴드 번호, 밴드 값) -> [(phash, 값), ...]
+        self._buckets = {}
+
+    def add(self, phash: int, value):
+        for band_key in phash_bands(phash):
+            self._buckets.setdefault(band_key, []).append((phash, value))
+
+    def find(self, phash: int):
+        """:return: 가장 가까운 해시의 값 또는 없으면 None"""
+        best_distance = self.max_distance + 1
+        best_value = None
+        for band_key in phash_bands(phash):
+            for candidate, value in self._buckets.get(band_key, ()):
+                distance = phash_distance(phash, candidate)
+                if distance < best_distance:
+                    best_distance = distance
+                    best_value = value
+                    if distance == 0:
+                        return best_value
+        return best_value
+
+    def __len__(self):
+        return sum(len(items) for items in self._buckets.values()) // PHASH_BANDS
@@ -0,0 +1,102 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from util.metrics import metrics
+
+def build_shards(products: list, shard_size: int) -> list:
+    """
+    상품을 (primary_category_id, secondary_category_id) 별로 묶고 id 순으로 shard_size개씩 나눔
+    (같은 샤드의 k-NN 쿼리는 같은 카테고리 파티션만 읽음)
+
+    :param products: [(id, primary_category_id, secondary_category_id), ...]
+    :return: [[id, ...], ...] (카테고리가 NULL인 상품은 유사 상품을 구할 수 없으므로 제외)
+    """
+    groups = {}
+    for product_id, primary_category_id, secondary_category_id in products:
+        if primary_category_id is None or secondary_category_id is None:
+            continue
+        groups.setdefault((primary_category_id, secondary_category_id), set()).add(product_id)
+
+    shards = []
+    for key in sorted(groups):
+        product_ids = sorted(groups[key])
+        for start in range(0, len(product_ids), shard_size):
+            shards.append(product_ids[start:start + shard_size])
+    return shards
+
+class ShardedExtractor:
+    """
+    유사 상품 추출을 카테고리별 고정 크기 샤드로 나눠 스레드 풀에서 병렬 실행.
+    샤드마다 get_similar_products -> update_similar_products_bulk 를 끝내는 대로 바로 MySQL에 반영하므로
+    결과 전체를 메모리에 모으지 않음. 커넥터(커넥션 풀)는 모든 워커가 공유.
+    한 샤드가 실패해도 나머지 샤드는 계속 진행하고, 실패한 샤드는 failed_shards에 남김.
+    checkpoint가 있으면 끝난 샤드를 기록하고, 같은 run_id로 다시 실행하면 기록된 샤드는 건너뜀.
+    """
+    def __init__(self, similarity_source, mysql_db, top_k: int = 100, workers: int = None, shard_size: int = None,
+                 checkpoint=None, run_id: str = None):
+        """
+        :param similarity_source: get_similar_products()를 가진 VectorDBConnector 또는 SimilarityEngine
+        :param mysql_db: DBConnector
+        :param top_k: 상품당 유사 상품 수
+        :param workers: 동시에 실행할 샤드 수 (기본값 EXTRACT_WORKERS, 없으면 CPU 수)
+        :param shard_size: 샤드당 상품 수 (기본값 EXTRACT_SHARD_SIZE)
+        :param checkpoint: CheckpointStore (없으면 기록하지 않음)
+        :param run_id: checkpoint에 기록할 실행 id
+        """
+        self.similarity_source = similarity_source
+        self.mysql_db = mysql_db
+        self.top_k = top_k
+        self.workers = workers or int(os.getenv('EXTRACT_WORKERS', os.cpu_count() or 1))
+        self.shard_size = shard_size or int(os.getenv('EXTRACT_SHARD_SIZE', 500))
+        self.checkpoint = checkpoint
+        self.run_id = run_id
+
+        self._lock = threading.Lock()
+        self.failed_shards = []
+        self.stats = {"products": 0, "shards": 0, "updated": 0, "failed_shards": 0, "skipped_shards": 0}
+
+    @staticmethod
+    def shard_key(shard: list) -> str:
+        # 한 상품은 한 카테고리에만 속하므로 (처음 id, 마지막 id, 상품 수)로 샤드 구분
+        return f"{shard[0]}-{shard[-1]}:{len(shard)}"
+
+    def run(self, products: list, stage: str = "extracted") -> dict:
+        """
+        :param products: [(id, primary_category_id, secondary_category_id), ...]
+        :param stage: checkpoint 단계 이름 (조건마다 다르게)
+        :return: 처리 건수
+        """
+        shards = build_shards(products, self.shard_size)
+        self.stats["products"] += sum(len(shard) for shard in shards)
+        if self.checkpoint is not None:
+            done = self.checkpoint.done_keys(self.run_id, stage)
+            remaining = [shard for shard in shards if self.shard_key(shard) not in done]
+            self.stats["skipped_shards"] += len(shards) - len(remaining)
+            shards = remaining
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="extract") as executor:
+            futures = {executor.submit(self._run_shard, shard, stage): shard for shard in shards}
+            for future in as_completed(futures):
+                shard = futures[future]
+                try:
+                    updated = future.result()
+                except Exception as e:
+                    print(f"Error extracting shard {shard[0]}..{shard[-1]} ({len(shard)} products): {str(e)}")
+                    metrics.failure("extract_shard", type(e).__name__)
+                    with self._lock:
+                        self.failed_shards.append(shard)
+                        self.stats["failed_shards"] += 1
+                    continue
+                with self._lock:
+                    self.stats["shards"] += 1
+                    self.stats["updated"] += updated
+        return self.stats
+
+    def _run_shard(self, shard: list, stage: str) -> int:
+        with metrics.timer("extract"):
+            similar_products = self.similarity_source.get_similar_products(shard, top_k=self.top_k)
+        updated = self.mysql_db.update_similar_products_bulk(similar_products)
+        if self.checkpoint is not None:
+            self.checkpoint.mark_done(self.run_id, stage, shard[0], shard[-1], len(shard), self.shard_key(shard))
+        return updated
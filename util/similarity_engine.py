@@ -0,0 +1,102 @@
+import os
+import threading
+from typing import List, Dict
+import numpy as np
+
+class SimilarityEngine:
+    """
+    VectorDBConnector.get_similar_products()의 인메모리 대체 구현.
+    (primary_category_id, secondary_category_id) 파티션별 SALE 벡터를 연속된 float32 행렬로 올려두고,
+    블록 단위 행렬곱 한 번으로 내적을 구한 뒤 argpartition으로 top-k를 뽑음.
+    반환 형태가 같아서 DBConnector.update_similar_products()에 그대로 넘길 수 있음.
+    """
+    def __init__(self, vector_db, block_elements: int = None):
+        """
+        :param vector_db: 벡터를 읽어올 VectorDBConnector 또는 VectorSnapshot
+        :param block_elements: 한 블록의 점수 행렬 원소 수 상한 (기본값 SIMILARITY_BLOCK_ELEMENTS, 약 128MB)
+        """
+        self.vector_db = vector_db
+        self.block_elements = block_elements or int(os.getenv('SIMILARITY_BLOCK_ELEMENTS', 32 * 1024 * 1024))
+        # (primary_category_id, secondary_category_id) -> (ids, vectors)
+        self._partitions = {}
+        # 여러 스레드가 같은 파티션을 동시에 요청해도 한 번만 읽도록 파티션별 락
+        self._lock = threading.Lock()
+        self._partition_locks = {}
+
+    def load_partition(self, primary_category_id: int, secondary_category_id: int) -> tuple:
+        key = (primary_category_id, secondary_category_id)
+        partition = self._partitions.get(key)
+        if partition is not None:
+            return partition
+        with self._lock:
+            partition_lock = self._partition_locks.setdefault(key, threading.Lock())
+        with partition_lock:
+            if key not in self._partitions:
+                ids, vectors = self.vector_db.fetch_partition_vectors(primary_category_id, secondary_category_id)
+                self._partitions[key] = (ids, np.ascontiguousarray(vectors, dtype=np.float32))
+            return self._partitions[key]
+
+    def clear(self):
+        """캐시된 파티션 삭제 (DB가 갱신된 뒤 다시 읽어야 할 때)"""
+        with self._lock:
+            self._partitions = {}
+            self._partition_locks = {}
+
+    def get_similar_products(self, product_ids: List[str], top_k: int = 100) -> Dict[str, List[str]]:
+        """
+        :param product_ids: 유사 상품을 구할 상품 id 리스트
+        :param top_k: 상품당 유사 상품 수
+        :return: { product_id: [similar_id, ...] } (유사도 높은 순)
+        """
+        if not product_ids:
+            return {}
+
+        # 카테고리 파티션별로 질의 상품을 묶음 (카테고리가 NULL이면 SQL 조인과 같이 제외)
+        groups = {}
+        for product_id, primary_category_id, secondary_category_id, vector in self.vector_db.fetch_vectors(product_ids):
+            if primary_category_id is None or secondary_category_id is None:
+                continue
+            groups.setdefault((primary_category_id, secondary_category_id), []).append((product_id, vector))
+
+        product_similars = {}
+        for (primary_category_id, secondary_category_id), queries in groups.items():
+            ids, vectors = self.load_partition(primary_category_id, secondary_category_id)
+            if len(ids) == 0:
+                continue
+            query_ids = np.asarray([product_id for product_id, _ in queries], dtype=np.int64)
+            query_vectors = np.vstack([vector for _, vector in queries]).astype(np.float32, copy=False)
+            product_similars.update(self._top_k(query_ids, query_vectors, ids, vectors, top_k))
+        return product_similars
+
+    def _top_k(self, query_ids: np.ndarray, query_vectors: np.ndarray, ids: np.ndarray, vectors: np.ndarray, top_k: int) -> dict:
+        """
+        질의 벡터 블록마다 내적 행렬을 구하고 top_k개를 유사도 내림차순으로 반환 (자기 자신 제외)
+        """
+        # 질의 상품이 파티션에 있으면 그 위치 (ids는 id 순 정렬)
+        positions = np.searchsorted(ids, query_ids)
+        in_partition = (positions < len(ids)) & (ids[np.minimum(positions, len(ids) - 1)] == query_ids)
+
+        block_rows = max(1, self.block_elements // len(ids))
+        result = {}
+        for start in range(0, len(query_ids), block_rows):
+            end = min(start + block_rows, len(query_ids))
+            scores = query_vectors[start:end] @ vectors.T
+
+            rows = np.arange(end - start)
+            self_rows = in_partition[start:end]
+            scores[rows[self_rows], positions[start:end][self_rows]] = -np.inf
+
+            k = min(top_k, len(ids))
+            if k < len(ids):
+                candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                candidates = np.tile(np.arange(len(ids)), (end - start, 1))
+            candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+            order = np.argsort(-candidate_scores, axis=1, kind="stable")
+            candidates = np.take_along_axis(candidates, order, axis=1)
+            candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+            for row in range(end - start):
+                valid = np.isfinite(candidate_scores[row])
+                result[int(query_ids[start + row])] = ids[candidates[row][valid]].tolist()
+        return result
@@ -0,0 +1,289 @@
+import os
+import json
+import struct
+import shutil
+from datetime import datetime
+from typing import List
+import numpy as np
+from sqlalchemy import text
+
+class VectorSnapshot:
+    """
+    PG product 테이블(id, 카테고리, status, 벡터)을 로컬 디스크에 컬럼별 .npy 파일로 떠둔 스냅샷.
+    np.load(mmap_mode='r')로 열기 때문에 여러 프로세스가 복사 없이 같은 페이지 캐시를 공유함.
+    fetch_vectors / fetch_partition_vectors가 VectorDBConnector와 같은 형태라서
+    SimilarityEngine(VectorSnapshot(path))처럼 DB 대신 넘길 수 있음.
+
+    디렉터리 구조:
+        manifest.json        현재 버전, 행 수, 차원, status 목록, watermark
+        v{N}/ids.npy         int64, id 오름차순
+        v{N}/primary_category_ids.npy, v{N}/secondary_category_ids.npy   int64 (NULL은 -1)
+        v{N}/status_codes.npy  int16, manifest의 statuses 인덱스 (NULL은 -1)
+        v{N}/vectors.npy     (n, dimension) float32 (halfvec이면 float16)
+
+    갱신은 새 버전 디렉터리를 다 쓴 뒤 manifest.json을 교체하는 방식이라
+    이미 열어둔 스냅샷은 그대로 읽을 수 있음.
+    """
+    COLUMNS = ("ids", "primary_category_ids", "secondary_category_ids", "status_codes", "vectors")
+    VECTOR_DTYPES = {'vector': (np.float32, '>f4'), 'halfvec': (np.float16, '>f2')}
+
+    def __init__(self, snapshot_dir: str = None, mmap: bool = True):
+        """
+        :param snapshot_dir: 스냅샷 디렉터리 (기본값 VECTOR_SNAPSHOT_DIR)
+        :param mmap: False면 배열을 메모리에 전부 읽어옴
+        """
+        self.snapshot_dir = snapshot_dir or os.getenv('VECTOR_SNAPSHOT_DIR', './cache/vector_snapshot')
+        self.mmap = mmap
+        self.reload()
+
+    @staticmethod
+    def read_manifest(snapshot_dir: str) -> dict:
+        """manifest.json 내용 (스냅샷이 없으면 None)"""
+        path = os.path.join(snapshot_dir, "manifest.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def reload(self):
+        """현재 manifest가 가리키는 버전을 다시 엶"""
+        self.manifest = self.read_manifest(self.snapshot_dir)
+        if self.manifest is None:
+            raise FileNotFoundError(f"No vector snapshot in {self.snapshot_dir}")
+        version_dir = os.path.join(self.snapshot_dir, self.manifest["dir"])
+        mmap_mode = 'r' if self.mmap else None
+        for column in self.COLUMNS:
+            setattr(self, column, np.load(os.path.join(version_dir, column + ".npy"), mmap_mode=mmap_mode))
+        self.statuses = self.manifest["statuses"]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def export(cls, vector_db, snapshot_dir: str = None) -> "VectorSnapshot":
+        """
+        product 테이블 전체를 새 스냅샷으로 내보냄
+
+        :param vector_db: VectorDBConnector
+        :param snapshot_dir: 스냅샷 디렉터리 (기본값 VECTOR_SNAPSHOT_DIR)
+        """
+        snapshot_dir = snapshot_dir or os.getenv('VECTOR_SNAPSHOT_DIR', './cache/vector_snapshot')
+        vector_type = vector_db.vector_type
+        session = vector_db.Session()
+        try:
+            # 행 수 조회와 본 조회가 같은 스냅샷을 보도록
+            session.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+            watermark, count, dimension = session.execute(text("""
+                SELECT now(), count(*), max(vector_dims(image_vector))
+                FROM product
+                WHERE image_vector IS NOT NULL
+            """)).fetchone()
+            rows = session.execute(cls._select_sql(vector_type, "image_vector IS NOT NULL")
+                                   .execution_options(stream_results=True))
+            manifest = cls._write_version(snapshot_dir, cls.read_manifest(snapshot_dir), vector_type,
+                                          count, dimension or 0, rows)
+        finally:
+            session.close()
+
+        manifest["watermark"] = watermark.isoformat()
+        cls._publish(snapshot_dir, manifest)
+        return cls(snapshot_dir)
+
+    def refresh(self, vector_db, overlap_seconds: float = None) -> int:
+        """
+        마지막 watermark 이후 updated_at이 바뀐 행만 받아서 새 버전으로 병합
+        PG에서 삭제된 행은 updated_at으로 알 수 없으므로 벡터가 있는 id 목록만 따로 받아서(벡터 제외) 스냅샷에서 지움
+
+        :param vector_db: VectorDBConnector
+        :param overlap_seconds: 늦게 커밋된 트랜잭션을 놓치지 않도록 watermark보다 앞서 다시 읽는 구간
+                                (기본값 VECTOR_SNAPSHOT_OVERLAP_SECONDS)
+        :return: 반영된 변경 행 수 (삭제된 행 포함)
+        """
+        if not vector_db.has_updated_at():
+            raise ValueError("product.updated_at is missing; run python -m main.migrate_updated_at before incremental refresh")
+        if overlap_seconds is None:
+            overlap_seconds = float(os.getenv('VECTOR_SNAPSHOT_OVERLAP_SECONDS', 300))
+        vector_type = self.manifest["vector_type"]
+        session = vector_db.Session()
+        try:
+            # 바뀐 행과 남아 있는 id 목록이 같은 시점을 보도록
+            session.execute(text("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ"))
+            watermark = session.execute(text("SELECT now()")).scalar()
+            rows = session.execute(
+                self._select_sql(vector_type, "updated_at > CAST(:since AS TIMESTAMPTZ) - make_interval(secs => :overlap)"),
+                {"since": self.manifest["watermark"], "overlap": overlap_seconds}
+            ).fetchall()
+            live_ids = np.asarray(session.execute(
+                text("SELECT id FROM product WHERE image_vector IS NOT NULL")
+            ).scalars().all(), dtype=np.int64)
+        finally:
+            session.close()
+
+        # 바뀐 행은 기존 행을 지우고 다시 넣음 (벡터가 NULL이 된 행과 삭제된 행은 지우기만)
+        changed_ids = np.asarray([row[0] for row in rows], dtype=np.int64)
+        live_rows = [row for row in rows if row[4] is not None]
+        deleted = ~np.isin(self.ids, live_ids)
+        keep = ~np.isin(self.ids, changed_ids) & ~deleted
+        deleted_count = int((deleted & ~np.isin(self.ids, changed_ids)).sum())
+
+        if rows or deleted_count:
+            dimension = self.manifest["dimension"]
+            if dimension == 0 and live_rows:
+                # 빈 테이블에서 내보낸 스냅샷이면 첫 벡터의 바이너리 헤더(int16 차원 수)에서 차원을 정함
+                dimension = struct.unpack(">H", bytes(live_rows[0][4][:2]))[0]
+            manifest = self._write_version(self.snapshot_dir, self.manifest, vector_type,
+                                           int(keep.sum()) + len(live_rows), dimension,
+                                           self._merge_rows(keep, live_rows))
+        else:
+            manifest = dict(self.manifest)
+        manifest["watermark"] = watermark.isoformat()
+        self._publish(self.snapshot_dir, manifest)
+        self.reload()
+        return len(rows) + deleted_count
+
+    def _merge_rows(self, keep: np.ndarray, new_rows: list):
+        """기존 행(keep) + 새 행을 id 순으로 합쳐서 (id, 대분류, 중분류, status, 벡터) 튜플로 yield"""
+        new_rows = sorted(new_rows, key=lambda row: row[0])
+        kept_positions = np.nonzero(keep)[0]
+        new_index = 0
+        for position in kept_positions:
+            product_id = int(self.ids[position])
+            while new_index < len(new_rows) and new_rows[new_index][0] < product_id:
+                yield new_rows[new_index]
+                new_index += 1
+            status_code = int(self.status_codes[position])
+            yield (product_id,
+                   self._optional_id(self.primary_category_ids[position]),
+                   self._optional_id(self.secondary_category_ids[position]),
+                   self.statuses[status_code] if status_code >= 0 else None,
+                   self.vectors[position])
+        yield from new_rows[new_index:]
+
+    @staticmethod
+    def _select_sql(vector_type: str, where: str):
+        # {type}_send: pgvector 바이너리 표현을 bytea로 받아서 텍스트 파싱 없이 numpy로 변환
+        return text(f"""
+            SELECT id, primary_category_id, secondary_category_id, status, {vector_type}_send(image_vector)
+            FROM product
+            WHERE {where}
+            ORDER BY id
+        """)
+
+    @classmethod
+    def _write_version(cls, snapshot_dir: str, previous: dict, vector_type: str,
+                       count: int, dimension: int, rows) -> dict:
+        """
+        rows를 새 버전 디렉터리에 기록하고 새 manifest dict 반환 (아직 공개 전)
+
+        :param rows: id 오름차순 (id, 대분류, 중분류, status, 벡터) - 벡터는 pgvector 바이너리 또는 numpy 배열
+        """
+        version = previous["version"] + 1 if previous else 1
+        version_name = f"v{version}"
+        version_dir = os.path.join(snapshot_dir, version_name)
+        if os.path.exists(version_dir):
+            # 이전에 실패한 기록이 남아 있으면 지우고 다시 씀
+            shutil.rmtree(version_dir)
+        os.makedirs(version_dir)
+
+        storage_dtype, wire_dtype = cls.VECTOR_DTYPES[vector_type]
+        ids = np.empty(count, dtype=np.int64)
+        primary_category_ids = np.empty(count, dtype=np.int64)
+        secondary_category_ids = np.empty(count, dtype=np.int64)
+        status_codes = np.empty(count, dtype=np.int16)
+        vectors = np.lib.format.open_memmap(os.path.join(version_dir, "vectors.npy"), mode='w+',
+                                            dtype=storage_dtype, shape=(count, dimension))
+
+        statuses = list(previous["statuses"]) if previous else []
+        status_index = {status: code for code, status in enumerate(statuses)}
+        written = 0
+        for product_id, primary_category_id, secondary_category_id, status, vector in rows:
+            if written >= count:
+                raise ValueError("More rows than expected while writing vector snapshot")
+            if status is None:
+                status_codes[written] = -1
+            else:
+                if status not in status_index:
+                    status_index[status] = len(statuses)
+                    statuses.append(status)
+                status_codes[written] = status_index[status]
+            ids[written] = product_id
+            primary_category_ids[written] = -1 if primary_category_id is None else primary_category_id
+            secondary_category_ids[written] = -1 if secondary_category_id is None else secondary_category_id
+            if isinstance(vector, np.ndarray):
+                vectors[written] = vector
+            else:
+                # 바이너리 헤더: int16 차원 수 + int16 예약
+                vectors[written] = np.frombuffer(vector, dtype=wire_dtype, offset=4)
+            written += 1
+        if written != count:
+            raise ValueError(f"Expected {count} rows but wrote {written}")
+        vectors.flush()
+        del vectors
+
+        for column, array in (("ids", ids), ("primary_category_ids", primary_category_ids),
+                              ("secondary_category_ids", secondary_category_ids), ("status_codes", status_codes)):
+            np.save(os.path.join(version_dir, column + ".npy"), array)
+
+        return {
+            "version": version,
+            "dir": version_name,
+            "count": count,
+            "dimension": dimension,
+            "vector_type": vector_type,
+            "vector_dtype": np.dtype(storage_dtype).name,
+            "statuses": statuses,
+            "max_id": int(ids[-1]) if count else None,
+            "created_at": datetime.now().isoformat(),
+        }
+
+    @staticmethod
+    def _publish(snapshot_dir: str, manifest: dict):
+        """manifest.json을 원자적으로 교체하고 이전 버전 디렉터리 정리"""
+        tmp_path = os.path.join(snapshot_dir, "manifest.json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(snapshot_dir, "manifest.json"))
+
+        # 이미 mmap으로 열린 파일은 지워도 닫을 때까지 읽을 수 있음
+        for name in os.listdir(snapshot_dir):
+            path = os.path.join(snapshot_dir, name)
+            if name.startswith("v") and name != manifest["dir"] and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _optional_id(value):
+        value = int(value)
+        return None if value < 0 else value
+
+    def fetch_vectors(self, product_ids: List[int]) -> list:
+        """
+        VectorDBConnector.fetch_vectors()와 같은 형태
+
+        :return: [(id, primary_category_id, secondary_category_id, float32 np.ndarray), ...]
+        """
+        if not product_ids or len(self.ids) == 0:
+            return []
+        query_ids = np.unique(np.asarray(list(product_ids), dtype=np.int64))
+        positions = np.searchsorted(self.ids, query_ids)
+        positions = positions[(positions < len(self.ids))]
+        positions = positions[np.isin(self.ids[positions], query_ids)]
+        return [(int(self.ids[position]),
+                 self._optional_id(self.primary_category_ids[position]),
+                 self._optional_id(self.secondary_category_ids[position]),
+                 np.asarray(self.vectors[position], dtype=np.float32))
+                for position in positions]
+
+    def fetch_partition_vectors(self, primary_category_id: int, secondary_category_id: int, status: str = 'SALE') -> tuple:
+        """
+        VectorDBConnector.fetch_partition_vectors()와 같은 형태
+
+        :return: (ids: int64 배열, vectors: (n, dimension) float32 배열)
+        """
+        if status not in self.statuses:
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+        mask = ((self.primary_category_ids == primary_category_id)
+                & (self.secondary_category_ids == secondary_category_id)
+                & (self.status_codes == self.statuses.index(status)))
+        if not mask.any():
+            return np.empty(0, dtype=np.int64), np.empty((0, 0), dtype=np.float32)
+        return np.asarray(self.ids[mask]), np.asarray(self.vectors[mask], dtype=np.float32)